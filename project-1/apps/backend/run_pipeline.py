@@ -25,7 +25,7 @@ def main():
         [python, os.path.join(src, "frequency.py"), "--force"],
         
         # 3. Zipf: Generates Zipf's law analysis
-        [python, os.path.join(src, "zipf.py"), "--max-points", "2000"],
+        [python, os.path.join(src, "zipf.py"), "--bins", "500"],
         
         # 4. Language Core: Builds the graph of connected words
         [python, os.path.join(src, "language_core.py"), 
@@ -61,8 +61,8 @@ def main():
         print(f"--- Copying files to frontend: {frontend_data} ---")
         files_to_copy = [
             "corpus_100000_tokens.json",
-            "frequency_table.json",
             "zipf_analysis.json",
+            "heaps_curve.json",
             "language_core_graph.json",
             "nouns_translations.json",
             "semantic_bipartite_graphs.json"
@@ -77,6 +77,17 @@ def main():
             else:
                 print(f"Warning: {fname} not found in processed dir")
 
+        # The frequency table is served as rank-ordered shards plus a manifest,
+        # so the frontend fetches only the rows it shows.
+        shards_src = os.path.join(backend_processed, "frequency_shards")
+        shards_dst = os.path.join(frontend_data, "frequency")
+        if os.path.isdir(shards_src):
+            shutil.rmtree(shards_dst, ignore_errors=True)
+            shutil.copytree(shards_src, shards_dst)
+            print("Copied frequency_shards -> frequency")
+        else:
+            print("Warning: frequency_shards not found in processed dir")
+
     print("\n=== SUCCESS: All processing steps completed! ===")
 
 if __name__ == "__main__":
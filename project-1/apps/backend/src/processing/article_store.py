@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import struct
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from vocabulary import Vocabulary
+
+STORE_VERSION = 1
+ARTICLES_FILENAME = "articles.bin"
+VOCAB_FILENAME = "vocab.txt"
+MANIFEST_FILENAME = "manifest.json"
+COMMIT_INTERVAL_SECONDS = 60.0
+
+# file_index, offset, end_offset, text bytes, token count
+_RECORD = struct.Struct("<IQQII")
+_ID_ITEMSIZE = array("I").itemsize
+
+
+@dataclass
+class Article:
+    file_index: int
+    offset: int
+    end_offset: int
+    text: str
+    tokens: List[str] = field(default_factory=list)
+    token_ids: Optional[array] = None
+
+    @property
+    def end_position(self) -> Tuple[int, int]:
+        return self.file_index, self.end_offset
+
+
+def _write_manifest(root: Path, manifest: dict) -> None:
+    tmp_path = root / f"{MANIFEST_FILENAME}.tmp"
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, root / MANIFEST_FILENAME)
+
+
+class ArticleStore:
+    def __init__(self, root: Path, manifest: dict, vocabulary: Vocabulary) -> None:
+        self.root = root
+        self.manifest = manifest
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def open(cls, root: Path, fingerprint: dict) -> Optional["ArticleStore"]:
+        manifest_path = root / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return None
+        with manifest_path.open(encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if manifest.get("version") != STORE_VERSION:
+            return None
+        if manifest.get("fingerprint") != fingerprint:
+            return None
+        vocabulary = Vocabulary.load(root / VOCAB_FILENAME, limit=manifest["vocab_size"])
+        return cls(root, manifest, vocabulary)
+
+    @property
+    def article_count(self) -> int:
+        return self.manifest["article_count"]
+
+    @property
+    def end_position(self) -> Optional[Tuple[int, int]]:
+        position = self.manifest.get("end_position")
+        return tuple(position) if position else None
+
+    def iter_articles(self, decode: bool = True) -> Iterator[Article]:
+        words = self.vocabulary.words
+        remaining = self.manifest["data_bytes"]
+        with (self.root / ARTICLES_FILENAME).open("rb", buffering=1 << 20) as handle:
+            while remaining > 0:
+                header = handle.read(_RECORD.size)
+                file_index, offset, end_offset, text_bytes, token_count = _RECORD.unpack(header)
+                text = handle.read(text_bytes).decode("utf-8")
+                token_ids = array("I")
+                token_ids.frombytes(handle.read(token_count * _ID_ITEMSIZE))
+                remaining -= _RECORD.size + text_bytes + token_count * _ID_ITEMSIZE
+                tokens = [words[token_id] for token_id in token_ids] if decode else []
+                yield Article(file_index, offset, end_offset, text, tokens, token_ids)
+
+    def writer(self) -> "ArticleStoreWriter":
+        return ArticleStoreWriter(self.root, self.manifest, self.vocabulary)
+
+
+class ArticleStoreWriter:
+    def __init__(self, root: Path, manifest: dict, vocabulary: Vocabulary) -> None:
+        self.root = root
+        self.manifest = dict(manifest)
+        self.vocabulary = vocabulary
+        self._handle = (root / ARTICLES_FILENAME).open("r+b")
+        # Drop any bytes written after the last committed manifest.
+        self._handle.truncate(self.manifest["data_bytes"])
+        self._handle.seek(self.manifest["data_bytes"])
+        self._committed_at = time.monotonic()
+
+    @classmethod
+    def create(cls, root: Path, fingerprint: dict) -> "ArticleStoreWriter":
+        if root.exists():
+            shutil.rmtree(root)
+        root.mkdir(parents=True)
+        (root / ARTICLES_FILENAME).touch()
+        manifest = {
+            "version": STORE_VERSION,
+            "fingerprint": fingerprint,
+            "article_count": 0,
+            "data_bytes": 0,
+            "vocab_size": 0,
+            "end_position": None,
+        }
+        return cls(root, manifest, Vocabulary())
+
+    def append(self, article: Article) -> None:
+        text = article.text.encode("utf-8")
+        token_ids = self.vocabulary.encode(article.tokens)
+        self._handle.write(
+            _RECORD.pack(
+                article.file_index,
+                article.offset,
+                article.end_offset,
+                len(text),
+                len(token_ids),
+            )
+        )
+        self._handle.write(text)
+        self._handle.write(token_ids.tobytes())
+        self.manifest["article_count"] += 1
+        self.manifest["end_position"] = list(article.end_position)
+        if time.monotonic() - self._committed_at >= COMMIT_INTERVAL_SECONDS:
+            self.commit()
+
+    def commit(self) -> None:
+        # Everything appended so far survives a crash once the manifest is replaced.
+        self._handle.flush()
+        self.manifest["data_bytes"] = self._handle.tell()
+        tmp_vocab = self.root / f"{VOCAB_FILENAME}.tmp"
+        self.vocabulary.save(tmp_vocab)
+        os.replace(tmp_vocab, self.root / VOCAB_FILENAME)
+        self.manifest["vocab_size"] = len(self.vocabulary)
+        _write_manifest(self.root, self.manifest)
+        self._committed_at = time.monotonic()
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        self.commit()
+        self._handle.close()
+
+    def __enter__(self) -> "ArticleStoreWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
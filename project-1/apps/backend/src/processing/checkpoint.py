@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import gzip
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+CHECKPOINT_VERSION = 6
+
+
+def save_checkpoint(path: Path, key: dict, state: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with gzip.open(tmp_path, "wb", compresslevel=1) as handle:
+        pickle.dump(
+            {"version": CHECKPOINT_VERSION, "key": key, "state": state},
+            handle,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Path, key: dict) -> Optional[Any]:
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rb") as handle:
+            payload = pickle.load(handle)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    except (AttributeError, ImportError):
+        # The state's class lives in a script module (__main__) of another
+        # entry point.
+        return None
+    # A checkpoint taken for another target, dump or tokenizer is ignored.
+    if payload.get("version") != CHECKPOINT_VERSION or payload.get("key") != key:
+        return None
+    return payload["state"]
+
+
+def clear_checkpoint(path: Path) -> None:
+    if path.exists():
+        path.unlink()
+
+
+class CheckpointTimer:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._last = time.monotonic()
+
+    def due(self) -> bool:
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return False
+        self._last = now
+        return True
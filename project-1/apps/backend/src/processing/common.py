@@ -1,16 +1,45 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import unicodedata
-from collections import Counter
-from dataclasses import dataclass
+import math
+import shutil
+import tempfile
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
 from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import Iterable, Iterator, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import re
 
+import numpy as np
 from bs4 import BeautifulSoup
 
+from article_store import Article, ArticleStore, ArticleStoreWriter
+from checkpoint import CheckpointTimer, clear_checkpoint, load_checkpoint, save_checkpoint
+from corpus_store import CorpusResult, DocumentTerms
+from dump_index import DumpIndex, iter_range_lines
+from dump_reader import (
+    ReadStats,
+    find_dump_files,
+    is_compressed,
+    iter_timed_lines,
+    iter_timed_ranges,
+    open_dump,
+)
+from external_sort import RunWriter, entries_for_memory, external_sort, merge_counts
+from frequency_sketch import SKETCH_DEPTH, SKETCH_WIDTH, FrequencySketch
+from html_text import EXTRACTOR_VERSION, extract_text
+from json_stream import existing_json, gzip_path, read_json_file, write_json_file
+from lemma_cache import LemmaCache, LemmaCacheDelta
+from processed_db import FrequencyView, ProcessedDb
+from table_shards import SHARD_ROWS, write_table_shards
+from vocabulary import Vocabulary
+
 try:
     import simplemma
 except ImportError:  # pragma: no cover - optional dependency
@@ -19,22 +48,41 @@ except ImportError:  # pragma: no cover - optional dependency
 BASE_DIR = Path(__file__).resolve().parents[2]
 RAW_ROOT = BASE_DIR / "data" / "raw"
 PROCESSED_DIR = BASE_DIR / "data" / "processed"
+CACHE_DIR = BASE_DIR / "data" / "cache"
 TARGET_TOKEN_COUNT = 100_000
+ARTICLE_CHUNK_SIZE = 64
+SHARD_ARTICLES = 20_000
 
-CORPUS_FILENAME = f"corpus_{TARGET_TOKEN_COUNT}_tokens.json"
+CORPUS_NAME = "corpus_{}_tokens"
 FREQUENCY_FILENAME = "frequency_table.json"
 ZIPF_FILENAME = "zipf_analysis.json"
+HEAPS_FILENAME = "heaps_curve.json"
+PROCESSED_DB_FILENAME = "processed.sqlite"
+FREQUENCY_SHARDS_DIRNAME = "frequency_shards"
 LANGUAGE_CORE_FILENAME = "language_core_graph.json"
+LANGUAGE_CORE_SWEEP_FILENAME = "language_core_sweep.json"
 NOUNS_FILENAME = "nouns_translations.json"
 SEMANTIC_FILENAME = "semantic_bipartite_graphs.json"
+NGRAMS_FILENAME = "ngram_tables.json"
+TFIDF_FILENAME = "tfidf_keyness.json"
+ARTICLE_STORE_DIRNAME = "article_store"
+LEMMA_CACHE_FILENAME = "lemma_cache.json"
+LEMMA_CACHE_SIZE = 200_000
+CHECKPOINT_DIRNAME = "checkpoints"
+NEIGHBOR_STATS_DIRNAME = "neighbor_stats"
+CHECKPOINT_INTERVAL_SECONDS = 120.0
+HEAPS_POINTS_PER_DECADE = 20
 
 WORD_RE = re.compile(r"[\w'\-]+", re.UNICODE)
+HTML_ENGINES = ("stream", "bs4")
+HTML_ENGINE = "stream"
 LEMMA_LANGUAGE = "pt"
 
 if simplemma is None:  # pragma: no cover - enforced dependency
     raise RuntimeError("Biblioteka simplemma jest wymagana do lematyzacji.")
 
 LEMMA_STRATEGY = f"simplemma[{LEMMA_LANGUAGE}]"
+LEMMATIZER_VERSION = getattr(simplemma, "__version__", "unknown")
 
 
 def _resolve_dump_dir() -> Path:
@@ -45,10 +93,17 @@ def _resolve_dump_dir() -> Path:
     raise FileNotFoundError("Nie znaleziono katalogu z dumpem ptwiki w src/data/raw")
 
 
-NDJSON_FILES = sorted(RAW_ROOT.glob("**/*.ndjson"))
+NDJSON_FILES = find_dump_files(RAW_ROOT)
+DUMP_READ_STATS = ReadStats()
+
 
+def html_to_text(html: str, engine: str = HTML_ENGINE) -> str:
+    if engine == "stream":
+        return extract_text(html)
+    return html_to_text_bs4(html)
 
-def html_to_text(html: str) -> str:
+
+def html_to_text_bs4(html: str) -> str:
     soup = BeautifulSoup(html, "html.parser")
     for element in soup(["script", "style"]):
         element.decompose()
@@ -228,31 +283,41 @@ EXTRA_STOPWORDS = {
 
 ALL_STOPWORDS = STOPWORDS | EXTRA_STOPWORDS
 
-def _normalize_token(token: str) -> Optional[str]:
-    token = token.strip("_'\"-")
-    if not token:
-        return None
-    if any(ch.isdigit() for ch in token):
-        return None
-        if not all(
-            unicodedata.category(ch).startswith("L") or ch in {"-", "'"}
-            for ch in token
-        ):
-            return None
-    # Filter single characters (except maybe 'é' but that's a verb, usually stopword anyway)
+# Changes whenever the lemmatizer or the stopword filter would produce different tokens.
+TOKENIZER_FINGERPRINT = hashlib.sha1(
+    "\n".join(
+        [LEMMA_STRATEGY, LEMMATIZER_VERSION, *sorted(ALL_STOPWORDS)]
+    ).encode("utf-8")
+).hexdigest()
+
+HANGUL_SYLLABLES_RE = re.compile("[\uac00-\ud7a3]")
+
+
+def _is_candidate(token: str) -> bool:
+    # Filters applied to a stripped surface form before lemmatization.
     if len(token) < 2:
-        return None
-    if not any(unicodedata.category(ch).startswith("L") for ch in token):
-        return None
-        
+        return False
+    # Fast path: an all-letter token has no digits and at least one letter
+    # (str.isalpha() is exactly the Unicode "L*" categories).
+    if not token.isalpha():
+        if any(ch.isdigit() for ch in token):
+            return False
+        if not any(ch.isalpha() for ch in token):
+            return False
     # Korean characters filter (Hangul Syllables)
-    if any(0xAC00 <= ord(ch) <= 0xD7A3 for ch in token):
-        return None
-        
+    if HANGUL_SYLLABLES_RE.search(token):
+        return False
     # LaTeX/Wiki artifacts filter
     if token.startswith("{") or token.startswith("\\") or "displaystyle" in token:
+        return False
+    return True
+
+
+def _normalize_token(token: str) -> Optional[str]:
+    token = token.strip("_'\"-")
+    if not _is_candidate(token):
         return None
-        
+
     lowered = token.lower()
     
     # Check stopwords BEFORE lemmatization to catch common forms
@@ -272,15 +337,81 @@ def _normalize_token(token: str) -> Optional[str]:
     return lemma
 
 
-def tokenize(text: str) -> List[str]:
+@lru_cache(maxsize=1)
+def get_lemma_cache() -> LemmaCache:
+    return LemmaCache.load(lemma_cache_path(), TOKENIZER_FINGERPRINT, LEMMA_CACHE_SIZE)
+
+
+def save_lemma_cache() -> None:
+    cache = get_lemma_cache()
+    if cache.dirty:
+        cache.save(lemma_cache_path())
+
+
+# Counters a pool task gathered in its worker process. The parent merges them
+# into its own, so pooled runs report and cache the same lookups as serial ones.
+@dataclass
+class TaskStats:
+    lemmas: LemmaCacheDelta
+    reads: ReadStats
+
+
+def _pooled(function, *arguments) -> Tuple[object, TaskStats]:
+    global DUMP_READ_STATS
+    cache = get_lemma_cache()
+    cache.start_recording()
+    DUMP_READ_STATS = ReadStats()
+    result = function(*arguments)
+    return result, TaskStats(cache.take_recorded(), DUMP_READ_STATS)
+
+
+def _merge_task_stats(stats: TaskStats) -> None:
+    get_lemma_cache().merge(stats.lemmas)
+    DUMP_READ_STATS.merge(stats.reads)
+
+
+def describe_dump_reads() -> Optional[str]:
+    if not DUMP_READ_STATS.files_opened:
+        return None
+    return DUMP_READ_STATS.describe()
+
+
+def describe_lemma_cache() -> Optional[str]:
+    stats = get_lemma_cache().stats()
+    if not stats["hits"] and not stats["misses"]:
+        return None
+    return (
+        f"Cache lematów: trafienia {stats['hit_rate']:.1%} "
+        f"({stats['hits']}/{stats['hits'] + stats['misses']}), "
+        f"wpisy {stats['entries']}/{stats['max_size']}, "
+        f"usunięte {stats['evictions']}"
+    )
+
+
+def tokenize(text: str, cache: Optional[LemmaCache] = None) -> List[str]:
     tokens: List[str] = []
+    lookup = (cache or get_lemma_cache()).lookup
     for raw_token in WORD_RE.findall(text):
-        normalized = _normalize_token(raw_token)
+        normalized = lookup(raw_token, _normalize_token)
         if normalized:
             tokens.append(normalized)
     return tokens
 
 
+def tokenize_batch(
+    texts: Iterable[str], cache: Optional[LemmaCache] = None
+) -> List[List[str]]:
+    # Same result as [tokenize(text) for text in texts], but every distinct
+    # surface form of the batch is normalized (and looked up) only once.
+    matches = [WORD_RE.findall(text) for text in texts]
+    lookup = (cache or get_lemma_cache()).lookup
+    surfaces = dict.fromkeys(chain.from_iterable(matches))
+    for surface in surfaces:
+        surfaces[surface] = lookup(surface, _normalize_token)
+    resolve = surfaces.__getitem__
+    return [[lemma for lemma in map(resolve, found) if lemma] for found in matches]
+
+
 def deduplicate_tokens(tokens: Iterable[str]) -> List[str]:
     seen: set[str] = set()
     unique: List[str] = []
@@ -293,96 +424,697 @@ def deduplicate_tokens(tokens: Iterable[str]) -> List[str]:
 
 
 @dataclass
-class CorpusResult:
-    tokens: List[str]
-    metadata: dict
-    frequencies: Optional[Counter[str]] = None
+class ArticleChunk:
+    articles: List[Article]
+    frequencies: Counter[str]
+    article_count: int
+    # Term counts of each article, aligned with `articles`.
+    article_terms: List[Counter[str]]
 
+    @property
+    def unique_tokens(self) -> List[str]:
+        # Counter keeps first-insertion order, i.e. first occurrence in the chunk.
+        return list(self.frequencies)
 
-def collect_corpus(target_tokens: int = TARGET_TOKEN_COUNT) -> CorpusResult:
-    tokens: List[str] = []
-    seen_tokens: set[str] = set()
+    @property
+    def token_count(self) -> int:
+        return sum(len(article.tokens) for article in self.articles)
+
+
+def _summarize_chunk(articles: List[Article]) -> ArticleChunk:
     frequencies: Counter[str] = Counter()
+    article_terms: List[Counter[str]] = []
     article_count = 0
-    files_considered = 0
-
-    for ndjson_file in NDJSON_FILES:
-        files_considered += 1
-        with ndjson_file.open(encoding="utf-8") as handle:
-            for line in handle:
-                if not line.strip():
-                    continue
-                try:
-                    payload = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                html = payload.get("article_body", {}).get("html")
-                if not html:
-                    continue
-                article_tokens = tokenize(html_to_text(html))
-                if not article_tokens:
-                    continue
-                article_count += 1
-                for token in article_tokens:
-                    frequencies[token] += 1
-                    if token in seen_tokens:
-                        continue
-                    seen_tokens.add(token)
-                    tokens.append(token)
-                    if len(tokens) >= target_tokens:
-                        metadata = {
-                            "target_tokens": target_tokens,
-                            "token_count": len(tokens),
-                            "articles_used": article_count,
-                            "files_considered": files_considered,
-                            "unique_words": len(seen_tokens),
-                            "total_observed_tokens": sum(frequencies.values()),
-                            "lemma_strategy": LEMMA_STRATEGY,
-                        }
-                        return CorpusResult(tokens, metadata, frequencies)
+    for article in articles:
+        terms = Counter(article.tokens)
+        article_terms.append(terms)
+        if terms:
+            article_count += 1
+            # Counters keep first-occurrence order, so this matches counting
+            # the tokens one by one.
+            frequencies.update(terms)
+    return ArticleChunk(articles, frequencies, article_count, article_terms)
 
-    metadata = {
-        "target_tokens": target_tokens,
-        "token_count": len(tokens),
-        "articles_used": article_count,
-        "files_considered": files_considered,
-        "unique_words": len(seen_tokens),
-        "total_observed_tokens": sum(frequencies.values()),
-        "note": "Nie osi�gni�to docelowej liczby token�w.",
-        "lemma_strategy": LEMMA_STRATEGY,
+
+def _article_html(line: bytes) -> Optional[str]:
+    if not line.strip():
+        return None
+    try:
+        payload = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    article_body = payload.get("article_body") or {}
+    return article_body.get("html") or None
+
+
+def _parse_lines(
+    lines: Iterable[Tuple[int, int, bytes]], tokenize_text: bool = True
+) -> List[Article]:
+    articles: List[Article] = []
+    for file_index, offset, line in lines:
+        html = _article_html(line)
+        if not html:
+            continue
+        text = html_to_text(html)
+        if not text:
+            continue
+        articles.append(Article(file_index, offset, offset + len(line), text))
+    if tokenize_text:
+        batch = tokenize_batch(article.text for article in articles)
+        for article, tokens in zip(articles, batch):
+            article.tokens = tokens
+    return articles
+
+
+def _iter_dump_lines(
+    start: Optional[Tuple[int, int]] = None,
+    stop_file: Optional[int] = None,
+) -> Iterator[Tuple[int, int, bytes]]:
+    start_file, start_offset = start or (0, 0)
+    stop_file = len(NDJSON_FILES) if stop_file is None else stop_file
+    for file_index in range(start_file, stop_file):
+        offset = start_offset if file_index == start_file else 0
+        path = NDJSON_FILES[file_index]
+        DUMP_READ_STATS.record_open(path)
+        with open_dump(path) as handle:
+            handle.seek(offset)
+            for line in iter_timed_lines(handle, DUMP_READ_STATS):
+                yield file_index, offset, line
+                offset += len(line)
+
+
+def iter_article_html() -> Iterator[str]:
+    for _, _, line in _iter_dump_lines():
+        html = _article_html(line)
+        if html:
+            yield html
+
+
+def iter_dump_articles(
+    start: Optional[Tuple[int, int]] = None,
+    tokenize_text: bool = True,
+) -> Iterator[Article]:
+    # Lines are parsed in batches so tokenization can share work between articles.
+    lines = _iter_dump_lines(start)
+    while True:
+        batch = list(islice(lines, ARTICLE_CHUNK_SIZE))
+        if not batch:
+            return
+        yield from _parse_lines(batch, tokenize_text)
+
+
+def dump_indexes() -> List[DumpIndex]:
+    return [DumpIndex.open(path) for path in NDJSON_FILES]
+
+
+def article_position(number: int) -> Tuple[int, int]:
+    # Global article number (across all dump files) -> (file index, byte offset).
+    remaining = number
+    for file_index, index in enumerate(dump_indexes()):
+        if remaining < len(index):
+            return file_index, index.offsets[remaining]
+        remaining -= len(index)
+    raise IndexError(f"Dump zawiera mniej niż {number + 1} artykułów.")
+
+
+def read_dump_line(position: Tuple[int, int]) -> bytes:
+    file_index, offset = position
+    index = DumpIndex.open(NDJSON_FILES[file_index])
+    return index.read(index.number_at(offset))
+
+
+def _parse_chunk(file_index: int, lines: List[Tuple[int, bytes]]) -> ArticleChunk:
+    return _summarize_chunk(
+        _parse_lines((file_index, offset, line) for offset, line in lines)
+    )
+
+
+def _iter_range_lines(
+    file_index: int, start: int, end: Optional[int]
+) -> Iterator[Tuple[int, bytes]]:
+    path = NDJSON_FILES[file_index]
+    DUMP_READ_STATS.record_open(path)
+    return iter_timed_ranges(iter_range_lines(path, start, end), DUMP_READ_STATS)
+
+
+def _parse_range(file_index: int, start: int, end: int) -> ArticleChunk:
+    lines = list(_iter_range_lines(file_index, start, end))
+    return _parse_chunk(file_index, lines)
+
+
+def _iter_chunk_tasks(
+    start: Optional[Tuple[int, int]], batch_size: int, use_index: bool = True
+) -> Iterator[tuple]:
+    # With a sidecar index workers read their own byte ranges; without one the
+    # parent reads the lines and ships them to the pool.
+    start_file, start_offset = start or (0, 0)
+    for file_index in range(start_file, len(NDJSON_FILES)):
+        offset = start_offset if file_index == start_file else 0
+        path = NDJSON_FILES[file_index]
+        index = None
+        if use_index and not is_compressed(path):
+            index = DumpIndex.load(path)
+        if index is not None:
+            for number in range(index.number_at(offset), len(index), batch_size):
+                stop = min(number + batch_size, len(index))
+                end = index.end_offset(stop - 1)
+                yield _parse_range, file_index, index.offsets[number], end
+            continue
+        batch: List[Tuple[int, bytes]] = []
+        lines = _iter_dump_lines((file_index, offset), stop_file=file_index + 1)
+        for _, line_offset, line in lines:
+            batch.append((line_offset, line))
+            if len(batch) >= batch_size:
+                yield _parse_chunk, file_index, batch
+                batch = []
+        if batch:
+            yield _parse_chunk, file_index, batch
+
+
+def _iter_dump_chunks(
+    start: Optional[Tuple[int, int]], workers: int
+) -> Iterator[ArticleChunk]:
+    if workers <= 1:
+        tasks = _iter_chunk_tasks(start, ARTICLE_CHUNK_SIZE, use_index=False)
+        for function, *arguments in tasks:
+            chunk = function(*arguments)
+            if chunk.articles:
+                yield chunk
+        return
+
+    # Chunks are parsed out of order by the pool but handed out in dump order;
+    # only a bounded number of chunks is in flight so an early stop stays cheap.
+    DUMP_READ_STATS.start()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for task in _iter_chunk_tasks(start, ARTICLE_CHUNK_SIZE):
+            pending.append(pool.submit(_pooled, *task))
+            if len(pending) < workers * 2:
+                continue
+            chunk, stats = pending.popleft().result()
+            _merge_task_stats(stats)
+            if chunk.articles:
+                yield chunk
+        while pending:
+            chunk, stats = pending.popleft().result()
+            _merge_task_stats(stats)
+            if chunk.articles:
+                yield chunk
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def dump_fingerprint() -> dict:
+    return {
+        "tokenizer": TOKENIZER_FINGERPRINT,
+        "html_engine": HTML_ENGINE,
+        "html_extractor": EXTRACTOR_VERSION,
+        "sources": [
+            [str(path.relative_to(RAW_ROOT)), path.stat().st_size]
+            for path in NDJSON_FILES
+        ],
     }
-    return CorpusResult(tokens, metadata, frequencies)
+
+
+def open_article_store() -> Optional[ArticleStore]:
+    return ArticleStore.open(article_store_path(), dump_fingerprint())
+
+
+def reset_article_store() -> None:
+    path = article_store_path()
+    if path.exists():
+        shutil.rmtree(path)
+
+
+def _open_store_writer(store: Optional[ArticleStore]) -> ArticleStoreWriter:
+    ensure_processed_dir()
+    if store is None:
+        return ArticleStoreWriter.create(article_store_path(), dump_fingerprint())
+    return store.writer()
+
+
+def _plan_dump_read(
+    store: Optional[ArticleStore],
+    after: Optional[Tuple[int, int]],
+    extend_store: bool,
+) -> Tuple[Optional[Tuple[int, int]], bool]:
+    # Where to start reading the dump and whether the store can still be
+    # extended: it only ever holds a gap-free prefix of the dump.
+    store_end = store.end_position if store is not None else None
+    if after is None or (store_end is not None and after <= store_end):
+        return store_end, extend_store
+    if extend_store and store is not None:
+        return store_end, True
+    return after, False
+
+
+def _is_after(article: Article, after: Optional[Tuple[int, int]]) -> bool:
+    return after is None or article.end_position > after
+
+
+def iter_articles(
+    tokenize_text: bool = True,
+    extend_store: bool = False,
+    after: Optional[Tuple[int, int]] = None,
+) -> Iterator[Article]:
+    # Articles already parsed by the corpus step come from the store; the rest
+    # is read from the dump, starting right after the last stored article.
+    # With `after` set, articles ending at or before that position are skipped.
+    store = open_article_store()
+    if store is not None:
+        for article in store.iter_articles(decode=tokenize_text):
+            if _is_after(article, after):
+                yield article
+    start, extend_store = _plan_dump_read(store, after, extend_store)
+
+    if not extend_store:
+        yield from iter_dump_articles(start, tokenize_text)
+        return
+
+    with _open_store_writer(store) as writer:
+        for article in iter_dump_articles(start):
+            writer.append(article)
+            if _is_after(article, after):
+                yield article
+
+
+def _iter_store_chunks(
+    store: ArticleStore, after: Optional[Tuple[int, int]]
+) -> Iterator[ArticleChunk]:
+    batch: List[Article] = []
+    for article in store.iter_articles():
+        if not _is_after(article, after):
+            continue
+        batch.append(article)
+        if len(batch) >= ARTICLE_CHUNK_SIZE:
+            yield _summarize_chunk(batch)
+            batch = []
+    if batch:
+        yield _summarize_chunk(batch)
+
+
+def iter_article_chunks(
+    workers: int = 1,
+    extend_store: bool = False,
+    after: Optional[Tuple[int, int]] = None,
+) -> Iterator[ArticleChunk]:
+    store = open_article_store()
+    if store is not None:
+        yield from _iter_store_chunks(store, after)
+    start, extend_store = _plan_dump_read(store, after, extend_store)
+
+    if not extend_store:
+        yield from _iter_dump_chunks(start, workers)
+        return
+
+    with _open_store_writer(store) as writer:
+        for chunk in _iter_dump_chunks(start, workers):
+            for article in chunk.articles:
+                writer.append(article)
+            if not _is_after(chunk.articles[-1], after):
+                continue
+            if not _is_after(chunk.articles[0], after):
+                chunk = _summarize_chunk(
+                    [article for article in chunk.articles if _is_after(article, after)]
+                )
+            yield chunk
+
+
+# A chunk counted in a pool worker. Only the summary and the counts travel
+# back to the parent; the articles are parsed again if they are needed.
+@dataclass
+class CountedChunk:
+    article_count: int
+    token_count: int
+    files_considered: int
+    end_position: Tuple[int, int]
+    counts: object
+    # The chunk itself when it came from the store, otherwise the task that
+    # parses it from the dump.
+    chunk: Optional[ArticleChunk] = None
+    task: Optional[tuple] = None
+
+    @classmethod
+    def of(cls, chunk: ArticleChunk, counts: object) -> "CountedChunk":
+        last = chunk.articles[-1]
+        return cls(
+            chunk.article_count,
+            chunk.token_count,
+            last.file_index + 1,
+            last.end_position,
+            counts,
+        )
+
+    def parse(self) -> ArticleChunk:
+        if self.chunk is not None:
+            return self.chunk
+        function, *arguments = self.task
+        return function(*arguments)
+
+
+def _article_tokens(chunk: ArticleChunk) -> List[List[str]]:
+    return [article.tokens for article in chunk.articles]
+
+
+def _parse_and_count(
+    count: Callable[[List[List[str]]], object], function, *arguments
+) -> Optional[CountedChunk]:
+    # Map step for dump chunks: the worker that parses a chunk also counts it.
+    chunk = function(*arguments)
+    if not chunk.articles:
+        return None
+    return CountedChunk.of(chunk, count(_article_tokens(chunk)))
+
+
+def _submit_count(
+    pool: ProcessPoolExecutor, count: Callable[[List[List[str]]], object], source
+) -> tuple:
+    # source is a chunk from the store or a dump task from _iter_chunk_tasks.
+    if isinstance(source, ArticleChunk):
+        return source, pool.submit(count, _article_tokens(source))
+    return source, pool.submit(_pooled, _parse_and_count, count, *source)
+
+
+def _collect_count(source, future) -> Optional[CountedChunk]:
+    if isinstance(source, ArticleChunk):
+        counted = CountedChunk.of(source, future.result())
+        counted.chunk = source
+        return counted
+    counted, stats = future.result()
+    _merge_task_stats(stats)
+    if counted is not None:
+        counted.task = source
+    return counted
+
+
+def iter_counted_chunks(
+    count: Callable[[List[List[str]]], object],
+    workers: int,
+    after: Optional[Tuple[int, int]] = None,
+) -> Iterator[CountedChunk]:
+    # Applies `count` to the token lists of every chunk in a pool of workers
+    # and hands the results out in dump order. Dump chunks are parsed and
+    # counted by the same task; chunks from the store are already tokenized
+    # and only their token lists are sent. Only a bounded number of chunks is
+    # in flight, so an early stop stays cheap.
+    store = open_article_store()
+    start, _ = _plan_dump_read(store, after, extend_store=False)
+    sources = _iter_chunk_tasks(start, ARTICLE_CHUNK_SIZE)
+    if store is not None:
+        sources = chain(_iter_store_chunks(store, after), sources)
+
+    DUMP_READ_STATS.start()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for source in sources:
+            pending.append(_submit_count(pool, count, source))
+            if len(pending) < workers * 2:
+                continue
+            counted = _collect_count(*pending.popleft())
+            if counted is not None:
+                yield counted
+        while pending:
+            counted = _collect_count(*pending.popleft())
+            if counted is not None:
+                yield counted
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# Collects the corpus for the smallest pending target size; larger sizes in
+# later_targets continue from the same scan, and each smaller size leaves a
+# snapshot identical to a separate run with that target.
+@dataclass
+class CorpusBuilder:
+    target_tokens: int
+    later_targets: List[int] = field(default_factory=list)
+    snapshots: Dict[int, CorpusResult] = field(default_factory=dict)
+    vocabulary: Vocabulary = field(default_factory=Vocabulary)
+    # Occurrences per vocabulary id.
+    counts: array = field(default_factory=lambda: array("q"))
+    article_count: int = 0
+    files_considered: int = 0
+    position: Optional[Tuple[int, int]] = None
+    total_tokens: int = 0
+    # Vocabulary growth as flat (total tokens, unique lemmas) pairs, recorded
+    # after the first article that reaches each log-spaced token count.
+    growth: array = field(default_factory=lambda: array("q"))
+    growth_step: int = 0
+    # Per-article term counts (CSR, see DocumentTerms) and document frequency
+    # per vocabulary id, recorded in the same pass.
+    document_counts: array = field(default_factory=lambda: array("q"))
+    doc_offsets: array = field(default_factory=lambda: array("q", [0]))
+    doc_term_ids: array = field(default_factory=lambda: array("I"))
+    doc_term_counts: array = field(default_factory=lambda: array("q"))
+    doc_positions: array = field(default_factory=lambda: array("q"))
+
+    @property
+    def next_growth_point(self) -> int:
+        return math.ceil(10 ** (self.growth_step / HEAPS_POINTS_PER_DECADE))
+
+    def _record_growth(self) -> None:
+        if self.total_tokens < self.next_growth_point:
+            return
+        self.growth.extend((self.total_tokens, len(self.vocabulary)))
+        while self.next_growth_point <= self.total_tokens:
+            self.growth_step += 1
+
+    def _record_document(self, article: Article, terms: Counter[str]) -> None:
+        vocabulary = self.vocabulary
+        document_counts = self.document_counts
+        document_counts.frombytes(bytes(8 * (len(vocabulary) - len(document_counts))))
+        for token, count in terms.items():
+            token_id = vocabulary.id(token)
+            document_counts[token_id] += 1
+            self.doc_term_ids.append(token_id)
+            self.doc_term_counts.append(count)
+        self.doc_offsets.append(len(self.doc_term_ids))
+        self.doc_positions.extend((article.file_index, article.offset))
+
+    def _drop_last_document(self) -> None:
+        start = self.doc_offsets[-2]
+        for token_id in self.doc_term_ids[start:]:
+            self.document_counts[token_id] -= 1
+        del self.doc_term_ids[start:]
+        del self.doc_term_counts[start:]
+        del self.doc_offsets[-1]
+        del self.doc_positions[-2:]
+
+    def _take_snapshot(self) -> None:
+        self.snapshots[self.target_tokens] = self.result(reached_target=True, copy=True)
+        self.target_tokens = self.later_targets.pop(0)
+
+    def add_article(self, article: Article, terms: Optional[Counter[str]] = None) -> bool:
+        self.files_considered = article.file_index + 1
+        self.position = article.end_position
+        if not article.tokens:
+            return False
+        self.article_count += 1
+        vocabulary = self.vocabulary
+        counts = self.counts
+        for consumed, token in enumerate(article.tokens, start=1):
+            token_id = vocabulary.get(token)
+            if token_id >= 0:
+                counts[token_id] += 1
+                continue
+            vocabulary.add(token)
+            counts.append(1)
+            if len(vocabulary) >= self.target_tokens:
+                self.total_tokens += consumed
+                # Only the part of the article up to the cutoff is in the corpus.
+                self._record_document(article, Counter(article.tokens[:consumed]))
+                if not self.later_targets:
+                    return True
+                # Snapshot the smaller corpus, then take the cut back and carry
+                # on with the rest of the article for the next size.
+                self._take_snapshot()
+                self._drop_last_document()
+                self.total_tokens -= consumed
+        self.total_tokens += len(article.tokens)
+        self._record_document(article, terms if terms is not None else Counter(article.tokens))
+        self._record_growth()
+        return False
+
+    def add_chunk(self, chunk: ArticleChunk) -> bool:
+        vocabulary = self.vocabulary
+        new_tokens = sum(1 for token in chunk.unique_tokens if token not in vocabulary)
+        chunk_tokens = chunk.token_count
+        if (
+            len(vocabulary) + new_tokens >= self.target_tokens
+            or self.total_tokens + chunk_tokens >= self.next_growth_point
+        ):
+            # The cutoff or a growth point falls inside this chunk: replay it
+            # article by article so the result matches the serial run exactly.
+            for article, terms in zip(chunk.articles, chunk.article_terms):
+                if self.add_article(article, terms):
+                    return True
+            return False
+        counts = self.counts
+        for token, count in chunk.frequencies.items():
+            token_id = vocabulary.get(token)
+            if token_id >= 0:
+                counts[token_id] += count
+            else:
+                vocabulary.add(token)
+                counts.append(count)
+        for article, terms in zip(chunk.articles, chunk.article_terms):
+            if terms:
+                self._record_document(article, terms)
+        self.article_count += chunk.article_count
+        self.total_tokens += chunk_tokens
+        self.files_considered = chunk.articles[-1].file_index + 1
+        self.position = chunk.articles[-1].end_position
+        return False
+
+    def result(
+        self,
+        reached_target: bool,
+        target_tokens: Optional[int] = None,
+        copy: bool = False,
+    ) -> CorpusResult:
+        # Every observed lemma is a corpus token, in first-seen order. A copy
+        # does not share the vocabulary with the builder, which keeps growing.
+        token_count = len(self.vocabulary)
+        counts = np.array(self.counts, dtype=np.int64)
+        growth = np.array(self.growth, dtype=np.int64).reshape(-1, 2)
+        if self.total_tokens and (not len(growth) or growth[-1, 0] != self.total_tokens):
+            growth = np.vstack([growth, [self.total_tokens, token_count]])
+        metadata = {
+            "target_tokens": target_tokens or self.target_tokens,
+            "token_count": token_count,
+            "articles_used": self.article_count,
+            "files_considered": (
+                self.files_considered if reached_target else len(NDJSON_FILES)
+            ),
+            "unique_words": token_count,
+            "total_observed_tokens": int(counts.sum()),
+        }
+        if not reached_target:
+            metadata["note"] = "Nie osi�gni�to docelowej liczby token�w."
+        metadata["lemma_strategy"] = LEMMA_STRATEGY
+        document_counts = np.zeros(token_count, dtype=np.int64)
+        document_counts[: len(self.document_counts)] = self.document_counts
+        documents = DocumentTerms(
+            np.array(self.doc_offsets, dtype=np.int64),
+            np.array(self.doc_term_ids, dtype=np.uint32),
+            np.array(self.doc_term_counts, dtype=np.int64),
+            np.array(self.doc_positions, dtype=np.int64).reshape(-1, 2),
+            document_counts,
+        )
+        return CorpusResult(
+            self.vocabulary.copy() if copy else self.vocabulary,
+            np.arange(token_count, dtype=np.uint32),
+            metadata,
+            counts,
+            growth,
+            documents,
+        )
+
+
+def collect_corpora(
+    target_sizes: Iterable[int],
+    workers: int = 1,
+    resume: bool = False,
+    checkpoint_interval: float = CHECKPOINT_INTERVAL_SECONDS,
+) -> Dict[int, CorpusResult]:
+    # One scan of the dump for all sizes; every result is the same as from
+    # collect_corpus with that size alone.
+    targets = sorted(set(target_sizes))
+    if not targets or targets[0] < 1:
+        raise ValueError("Docelowe rozmiary korpusu muszą być dodatnie.")
+    path = checkpoint_path("corpus")
+    key = {"step": "corpus", "target_sizes": targets, **dump_fingerprint()}
+    builder = load_checkpoint(path, key) if resume else None
+    if builder is None:
+        builder = CorpusBuilder(targets[0], targets[1:])
+
+    reached_target = False
+    timer = CheckpointTimer(checkpoint_interval)
+    with closing(
+        iter_article_chunks(workers, extend_store=True, after=builder.position)
+    ) as chunks:
+        for chunk in chunks:
+            if builder.add_chunk(chunk):
+                reached_target = True
+                break
+            if timer.due():
+                save_checkpoint(path, key, builder)
+    clear_checkpoint(path)
+    results = dict(builder.snapshots)
+    if reached_target:
+        results[builder.target_tokens] = builder.result(reached_target=True)
+    else:
+        # The dump ran out: every size not reached gets the whole collection.
+        for target in [builder.target_tokens, *builder.later_targets]:
+            results[target] = builder.result(reached_target=False, target_tokens=target)
+    return results
+
+
+def collect_corpus(
+    target_tokens: int = TARGET_TOKEN_COUNT,
+    workers: int = 1,
+    resume: bool = False,
+    checkpoint_interval: float = CHECKPOINT_INTERVAL_SECONDS,
+) -> CorpusResult:
+    return collect_corpora([target_tokens], workers, resume, checkpoint_interval)[
+        target_tokens
+    ]
 
 
 def ensure_processed_dir() -> None:
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def write_json(path: Path, data: dict) -> None:
+def write_json(path: Path, data: dict, compact: bool = False) -> None:
+    # Iterator values are streamed as JSON arrays; a .gz path is gzip-compressed.
     ensure_processed_dir()
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(data, handle, ensure_ascii=False, indent=2)
+    write_json_file(path, data, compact=compact)
 
 
 def read_json(path: Path) -> dict:
-    with path.open(encoding="utf-8") as handle:
-        return json.load(handle)
+    return read_json_file(path)
+
+
+def json_output_path(path: Path, compress: bool = False) -> Path:
+    return gzip_path(path) if compress else path
+
+
+def sized_filename(filename: str, target_tokens: int) -> str:
+    # Outputs for the default corpus size keep their plain names.
+    if target_tokens == TARGET_TOKEN_COUNT:
+        return filename
+    path = Path(filename)
+    return f"{path.stem}_{target_tokens}_tokens{path.suffix}"
+
+
+def corpus_path(target_tokens: int = TARGET_TOKEN_COUNT) -> Path:
+    return PROCESSED_DIR / f"{CORPUS_NAME.format(target_tokens)}.json"
 
 
-def corpus_path() -> Path:
-    return PROCESSED_DIR / CORPUS_FILENAME
+def frequency_path(target_tokens: int = TARGET_TOKEN_COUNT) -> Path:
+    return PROCESSED_DIR / sized_filename(FREQUENCY_FILENAME, target_tokens)
 
 
-def frequency_path() -> Path:
-    return PROCESSED_DIR / FREQUENCY_FILENAME
-def zipf_path() -> Path:
-    return PROCESSED_DIR / ZIPF_FILENAME
+def zipf_path(target_tokens: int = TARGET_TOKEN_COUNT) -> Path:
+    return PROCESSED_DIR / sized_filename(ZIPF_FILENAME, target_tokens)
+
+
+def heaps_path(target_tokens: int = TARGET_TOKEN_COUNT) -> Path:
+    return PROCESSED_DIR / sized_filename(HEAPS_FILENAME, target_tokens)
 
 
 def language_core_path() -> Path:
     return PROCESSED_DIR / LANGUAGE_CORE_FILENAME
 
 
+def language_core_sweep_path() -> Path:
+    return PROCESSED_DIR / LANGUAGE_CORE_SWEEP_FILENAME
+
+
 def nouns_path() -> Path:
     return PROCESSED_DIR / NOUNS_FILENAME
 
@@ -391,60 +1123,387 @@ def semantic_path() -> Path:
     return PROCESSED_DIR / SEMANTIC_FILENAME
 
 
-def load_or_build_corpus(force_rebuild: bool = False) -> CorpusResult:
-    path = corpus_path()
-    if path.exists() and not force_rebuild:
+def frequency_shards_path() -> Path:
+    return PROCESSED_DIR / FREQUENCY_SHARDS_DIRNAME
+
+
+def processed_db_path() -> Path:
+    return PROCESSED_DIR / PROCESSED_DB_FILENAME
+
+
+def tfidf_path() -> Path:
+    return PROCESSED_DIR / TFIDF_FILENAME
+
+
+def ngrams_path() -> Path:
+    return PROCESSED_DIR / NGRAMS_FILENAME
+
+
+def corpus_store_path(target_tokens: int = TARGET_TOKEN_COUNT) -> Path:
+    return PROCESSED_DIR / CORPUS_NAME.format(target_tokens)
+
+
+def article_store_path() -> Path:
+    return PROCESSED_DIR / ARTICLE_STORE_DIRNAME
+
+
+def lemma_cache_path() -> Path:
+    return CACHE_DIR / LEMMA_CACHE_FILENAME
+
+
+def neighbor_stats_path(target_unique: int, window: int, weighted: bool) -> Path:
+    name = f"{target_unique}_window_{window}{'_weighted' if weighted else ''}"
+    return CACHE_DIR / NEIGHBOR_STATS_DIRNAME / name
+
+
+def checkpoint_path(step: str) -> Path:
+    return CACHE_DIR / CHECKPOINT_DIRNAME / f"{step}.ckpt"
+
+
+def load_corpus(target_tokens: int = TARGET_TOKEN_COUNT) -> Optional[CorpusResult]:
+    stored = CorpusResult.load(corpus_store_path(target_tokens))
+    if stored is not None:
+        return stored
+    path = corpus_path(target_tokens)
+    if path.exists():
+        # JSON export from before the binary store: tokens only, no counts.
         payload = read_json(path)
-        tokens = payload["tokens"]
-        metadata = dict(payload["metadata"])
-        return CorpusResult(tokens=tokens, metadata=metadata)
-
-    result = collect_corpus()
-    tokens = deduplicate_tokens(result.tokens)
-    metadata = dict(result.metadata)
-    metadata["token_count"] = len(tokens)
-    write_json(path, {"tokens": tokens, "metadata": metadata})
-    return CorpusResult(
-        tokens=tokens, metadata=metadata, frequencies=result.frequencies
-    )
+        vocabulary = Vocabulary(payload["tokens"])
+        token_ids = np.arange(len(vocabulary), dtype=np.uint32)
+        return CorpusResult(vocabulary, token_ids, dict(payload["metadata"]))
+    return None
+
 
+def load_or_build_corpora(
+    target_sizes: Iterable[int],
+    force_rebuild: bool = False,
+    refresh_store: bool = False,
+    workers: int = 1,
+    resume: bool = False,
+) -> Dict[int, CorpusResult]:
+    # Sizes without a stored corpus are all collected in a single scan.
+    results: Dict[int, CorpusResult] = {}
+    targets = sorted(set(target_sizes))
+    if not force_rebuild and not resume:
+        for target in targets:
+            stored = load_corpus(target)
+            if stored is not None:
+                results[target] = stored
+    missing = [target for target in targets if target not in results]
+    if not missing:
+        return results
 
-def frequency_table(counter: Counter[str]) -> List[dict]:
-    total = sum(counter.values())
-    table: List[dict] = []
-    for rank, (word, count) in enumerate(counter.most_common(), start=1):
-        table.append(
-            {
-                "rank": rank,
-                "word": word,
-                "count": count,
-                "relative_frequency": count / total if total else 0.0,
-            }
+    if refresh_store:
+        reset_article_store()
+    collected = collect_corpora(missing, workers=workers, resume=resume)
+    save_lemma_cache()
+    for target, result in collected.items():
+        result.save(corpus_store_path(target))
+        # The JSON copy is only an export for the frontend.
+        write_json(
+            corpus_path(target), {"tokens": result.tokens, "metadata": result.metadata}
         )
+    results.update(collected)
+    return results
+
+
+def load_or_build_corpus(
+    force_rebuild: bool = False,
+    refresh_store: bool = False,
+    workers: int = 1,
+    resume: bool = False,
+    target_tokens: int = TARGET_TOKEN_COUNT,
+) -> CorpusResult:
+    return load_or_build_corpora(
+        [target_tokens], force_rebuild, refresh_store, workers, resume
+    )[target_tokens]
+
+
+def frequency_table(ranked: Iterable[Tuple[str, int]], total: int) -> Iterator[dict]:
+    for rank, (word, count) in enumerate(ranked, start=1):
+        yield {
+            "rank": rank,
+            "word": word,
+            "count": count,
+            "relative_frequency": count / total if total else 0.0,
+        }
+
+
+def _db_frequency_rows(
+    metadata: dict, table: Iterable[dict], corpus_metadata: Optional[dict]
+) -> Iterator[dict]:
+    with ProcessedDb(processed_db_path()) as db:
+        if corpus_metadata is not None:
+            db.write_metadata("corpus", corpus_metadata)
+        yield from db.store_frequency(metadata, table)
+
+
+def _frequency_rows(
+    metadata: dict,
+    table: Iterable[dict],
+    sqlite: bool,
+    corpus_metadata: Optional[dict] = None,
+) -> Iterable[dict]:
+    # With sqlite the rows are also stored in the processed database while the
+    # JSON is written; without it a stored table would be stale, so it is dropped.
+    if sqlite:
+        return _db_frequency_rows(metadata, table, corpus_metadata)
+    db = ProcessedDb.open(processed_db_path())
+    if db is not None:
+        with db:
+            db.clear_frequency()
     return table
 
 
-def load_or_build_frequency(force_rebuild: bool = False) -> dict:
-    path = frequency_path()
-    if path.exists() and not force_rebuild:
-        return read_json(path)
+def open_frequency_view() -> Optional[FrequencyView]:
+    # The view owns the database connection; without a stored table the
+    # connection is closed right away.
+    db = ProcessedDb.open(processed_db_path())
+    if db is None:
+        return None
+    view = db.frequency_view()
+    if view is None:
+        db.close()
+    return view
 
-    corpus = load_or_build_corpus(force_rebuild=True)
-    counter = corpus.frequencies or Counter(corpus.tokens)
-    table = frequency_table(counter)
-    total_tokens = sum(counter.values())
-    payload = {
-        "metadata": {
-            "total_tokens": total_tokens,
-            "unique_words": len(counter),
-            "source_corpus_tokens": len(corpus.tokens),
-        },
-        "data": table,
+
+def close_frequency(payload: dict) -> None:
+    # Releases the database connection of a table loaded as a lazy view.
+    if isinstance(payload["data"], FrequencyView):
+        payload["data"].close()
+
+
+def store_graph_edges(graph: str, edges: Iterable[Tuple[str, str, float]]) -> None:
+    ensure_processed_dir()
+    with ProcessedDb(processed_db_path()) as db:
+        db.write_edges(graph, edges)
+
+
+def build_frequency(
+    force_rebuild: bool = False,
+    compact: bool = False,
+    compress: bool = False,
+    sqlite: bool = False,
+    target_tokens: int = TARGET_TOKEN_COUNT,
+    corpus: Optional[CorpusResult] = None,
+) -> dict:
+    if corpus is None:
+        corpus = load_or_build_corpus(force_rebuild=force_rebuild, target_tokens=target_tokens)
+    if corpus.counts is None:
+        corpus = load_or_build_corpus(force_rebuild=True, target_tokens=target_tokens)
+    total_tokens = corpus.total_count
+    metadata = {
+        "total_tokens": total_tokens,
+        "unique_words": len(corpus.counts),
+        "source_corpus_tokens": len(corpus.token_ids),
+    }
+    table: Iterable[dict] = frequency_table(corpus.iter_most_common(), total_tokens)
+    # The processed database holds the table of the default corpus size only.
+    if target_tokens == TARGET_TOKEN_COUNT:
+        table = _frequency_rows(metadata, table, sqlite, corpus.metadata)
+    write_json(
+        json_output_path(frequency_path(target_tokens), compress),
+        {"metadata": metadata, "data": table},
+        compact=compact,
+    )
+    return metadata
+
+
+def approximate_frequency_table(
+    ranked: Iterable[Tuple[str, int, int]], total: int
+) -> Iterator[dict]:
+    for rank, (word, count, lower) in enumerate(ranked, start=1):
+        yield {
+            "rank": rank,
+            "word": word,
+            "count": count,
+            "count_lower_bound": lower,
+            "relative_frequency": count / total if total else 0.0,
+        }
+
+
+def build_approximate_frequency(
+    top_k: int,
+    sketch_width: int = SKETCH_WIDTH,
+    sketch_depth: int = SKETCH_DEPTH,
+    workers: int = 1,
+    compact: bool = False,
+    compress: bool = False,
+    sqlite: bool = False,
+) -> dict:
+    # Whole-dump counts in fixed memory: a count-min sketch for the counts and
+    # Misra-Gries counters for picking the top_k words. Each count is an upper
+    # bound; count_lower_bound is the Misra-Gries counter.
+    sketch = FrequencySketch.create(top_k, sketch_width, sketch_depth)
+    with closing(iter_article_chunks(workers)) as chunks:
+        for chunk in chunks:
+            sketch.add(chunk.frequencies, chunk.article_count)
+    ranked = sketch.most_common()
+    metadata = {
+        "total_tokens": sketch.total,
+        # The number of distinct words is only estimated from the sketch; the
+        # table holds the top rows of the Misra-Gries candidates.
+        "unique_words_estimate": sketch.unique_words_estimate(),
+        "candidates": sketch.candidates,
+        "rows": len(ranked),
+        "articles_used": sketch.article_count,
+        "approximate": True,
+        "error_bounds": sketch.error_bounds(),
     }
-    write_json(path, payload)
-    return payload
+    table = _frequency_rows(
+        metadata, approximate_frequency_table(ranked, sketch.total), sqlite
+    )
+    write_json(
+        json_output_path(frequency_path(), compress),
+        {"metadata": metadata, "data": table},
+        compact=compact,
+    )
+    return metadata
+
+
+def _by_frequency(item: Tuple[str, int]) -> Tuple[int, str]:
+    return -item[1], item[0]
+
+
+@dataclass
+class ShardCounts:
+    runs: List[Path]
+    total_tokens: int
+    article_count: int
+
+
+def _iter_frequency_shards() -> Iterator[Tuple[int, int, Optional[int]]]:
+    # (file index, start, end) byte ranges of about SHARD_ARTICLES articles;
+    # files without a sidecar index are one shard each.
+    for file_index, path in enumerate(NDJSON_FILES):
+        index = None if is_compressed(path) else DumpIndex.load(path)
+        if index is None:
+            yield file_index, 0, None
+            continue
+        for number in range(0, len(index), SHARD_ARTICLES):
+            stop = min(number + SHARD_ARTICLES, len(index))
+            yield file_index, index.offsets[number], index.end_offset(stop - 1)
+
+
+def _count_shard(
+    shard: Tuple[int, int, Optional[int]], spill_dir: Path, max_entries: int
+) -> ShardCounts:
+    # Map step: counts one shard, spilling word-sorted runs whenever the
+    # counter grows past max_entries.
+    file_index, start, end = shard
+    writer = RunWriter(spill_dir, f"shard-{file_index:03d}-{start:012d}")
+    counts: Counter[str] = Counter()
+    total_tokens = 0
+    article_count = 0
+    lines = (
+        (file_index, offset, line)
+        for offset, line in _iter_range_lines(file_index, start, end)
+    )
+    while True:
+        batch = list(islice(lines, ARTICLE_CHUNK_SIZE))
+        if not batch:
+            break
+        for article in _parse_lines(batch):
+            if not article.tokens:
+                continue
+            article_count += 1
+            total_tokens += len(article.tokens)
+            counts.update(article.tokens)
+        if len(counts) >= max_entries:
+            writer.write(counts.items())
+            counts = Counter()
+    if counts:
+        writer.write(counts.items())
+    return ShardCounts(writer.paths, total_tokens, article_count)
+
+
+def build_sharded_frequency(
+    workers: int = 1,
+    memory_limit_mb: float = 512.0,
+    compact: bool = False,
+    compress: bool = False,
+    sqlite: bool = False,
+) -> dict:
+    # Exact whole-dump counts. Each worker gets an equal share of the memory
+    # limit; the reduce step merges the word-sorted runs and then sorts the
+    # merged counts by frequency, spilling again if they do not fit. Ties are
+    # ordered by word, so the table does not depend on the number of workers.
+    workers = max(1, workers)
+    max_entries = entries_for_memory(memory_limit_mb / workers)
+    shards = list(_iter_frequency_shards())
+    ensure_processed_dir()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="frequency-", dir=CACHE_DIR) as spill_root:
+        spill_dir = Path(spill_root)
+        arguments = ([spill_dir] * len(shards), [max_entries] * len(shards))
+        if workers == 1:
+            results = list(map(_count_shard, shards, *arguments))
+        else:
+            DUMP_READ_STATS.start()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = []
+                tasks = [_count_shard] * len(shards)
+                for result, stats in pool.map(_pooled, tasks, shards, *arguments):
+                    _merge_task_stats(stats)
+                    results.append(result)
+        runs = [path for result in results for path in result.runs]
+        total_tokens = sum(result.total_tokens for result in results)
+
+        # Reduce step: word-sorted runs -> summed counts -> frequency order.
+        ranked_writer = RunWriter(spill_dir, "ranked")
+        unique_words, ranked = external_sort(
+            merge_counts(runs), _by_frequency, max_entries, ranked_writer
+        )
+        for path in runs:
+            path.unlink()
+
+        metadata = {
+            "total_tokens": total_tokens,
+            "unique_words": unique_words,
+            "articles_used": sum(result.article_count for result in results),
+            "files_considered": len(NDJSON_FILES),
+            "mode": "map_reduce",
+            "shards": len(shards),
+            "spilled_runs": len(runs) + len(ranked_writer.paths),
+            "memory_limit_mb": memory_limit_mb,
+        }
+        table = _frequency_rows(metadata, frequency_table(ranked, total_tokens), sqlite)
+        write_json(
+            json_output_path(frequency_path(), compress),
+            {"metadata": metadata, "data": table},
+            compact=compact,
+        )
+    return metadata
+
+
+def load_or_build_frequency(
+    force_rebuild: bool = False, target_tokens: int = TARGET_TOKEN_COUNT
+) -> dict:
+    # A table stored in the processed database is returned as a lazy view
+    # that reads rows on demand instead of loading the whole JSON.
+    if not force_rebuild and target_tokens == TARGET_TOKEN_COUNT:
+        view = open_frequency_view()
+        if view is not None:
+            return {"metadata": view.metadata, "data": view}
+    path = existing_json(frequency_path(target_tokens))
+    if path is None or force_rebuild:
+        build_frequency(force_rebuild=force_rebuild, target_tokens=target_tokens)
+        path = frequency_path(target_tokens)
+    return read_json(path)
+
+
+def export_frequency_shards(rows_per_shard: int = SHARD_ROWS) -> dict:
+    # Paginated copy of the frequency table for the frontend.
+    payload = load_or_build_frequency()
+    manifest = write_table_shards(
+        frequency_shards_path(), payload["metadata"], payload["data"], rows_per_shard
+    )
+    close_frequency(payload)
+    return manifest
 
 
 def iter_corpus_tokens() -> Iterator[str]:
     corpus = load_or_build_corpus()
-    yield from corpus.tokens
+    words = corpus.vocabulary.words
+    for token_id in corpus.token_ids.tolist():
+        yield words[token_id]
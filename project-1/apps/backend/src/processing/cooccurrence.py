@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from corpus_store import MANIFEST_FILENAME, save_array
+from ngram_counts import KEY_DTYPE, NgramTable, merge_tables
+from vocabulary import Vocabulary
+
+PAIR_BITS = 32
+PAIR_MASK = KEY_DTYPE((1 << PAIR_BITS) - 1)
+# Pairs collected before they are reduced to one sorted run.
+PAIR_BATCH = 1 << 20
+MAX_RUNS = 8
+# lcm(1..20) = 232792560, so summed weights stay exact in int64 up to about
+# 4e10 occurrences of one pair; lcm(1..30) would overflow after about 4e6.
+MAX_WEIGHTED_WINDOW = 20
+ASSOCIATION_MEASURES = ("pmi", "npmi", "llr", "t_score")
+NEIGHBOR_STATS_VERSION = 1
+VOCAB_FILENAME = "vocab.txt"
+TOKEN_COUNTS_FILENAME = "token_counts.npy"
+# CooccurrenceMatrix field -> file name
+PAIR_FILENAMES = {
+    "rows": "pair_rows.npy",
+    "cols": "pair_cols.npy",
+    "counts": "pair_counts.npy",
+}
+PAIR_ID_DTYPE = np.uint32
+
+
+def pack_pairs(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    # An unordered pair becomes one key with the smaller id in the high bits,
+    # so every pair lands in the upper triangle (row < col).
+    low = np.minimum(first, second).astype(KEY_DTYPE)
+    high = np.maximum(first, second).astype(KEY_DTYPE)
+    return (low << KEY_DTYPE(PAIR_BITS)) | high
+
+
+def distance_scale(window: int) -> int:
+    # 1/d for every d <= window is a whole multiple of 1/lcm(1..window), so
+    # distance weights are summed exactly as integers and divided at the end.
+    if window > MAX_WEIGHTED_WINDOW:
+        raise ValueError(
+            f"Ważenie odległością działa dla okna do {MAX_WEIGHTED_WINDOW} tokenów."
+        )
+    return math.lcm(*range(1, window + 1))
+
+
+def window_pairs(
+    ids: np.ndarray, window: int, weighted: bool = False
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # Pairs of different lemmas at most `window` positions apart, one shifted
+    # copy of the id array per distance. With weighting, a pair at distance d
+    # weighs scale / d.
+    scale = distance_scale(window) if weighted else 1
+    keys: List[np.ndarray] = []
+    weights: List[np.ndarray] = []
+    for distance in range(1, window + 1):
+        first = ids[:-distance]
+        second = ids[distance:]
+        keep = first != second
+        keys.append(pack_pairs(first[keep], second[keep]))
+        if weighted:
+            weights.append(np.full(len(keys[-1]), scale // distance, dtype=np.int64))
+    return np.concatenate(keys), np.concatenate(weights) if weighted else None
+
+
+# Symmetric co-occurrence counts stored as the upper triangle in COO form,
+# sorted by (row, col). Distance-weighted counts are kept as integers in units
+# of 1/scale.
+@dataclass
+class CooccurrenceMatrix:
+    size: int
+    rows: np.ndarray
+    cols: np.ndarray
+    counts: np.ndarray
+    scale: int = 1
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @classmethod
+    def from_table(
+        cls, table: NgramTable, size: int, scale: int = 1
+    ) -> "CooccurrenceMatrix":
+        rows = (table.keys >> KEY_DTYPE(PAIR_BITS)).astype(np.int64)
+        cols = (table.keys & PAIR_MASK).astype(np.int64)
+        return cls(size, rows, cols, table.counts, scale)
+
+    def _unscaled(self, counts: np.ndarray) -> np.ndarray:
+        return counts / self.scale if self.scale != 1 else counts
+
+    def weights(self) -> np.ndarray:
+        return self._unscaled(self.counts)
+
+    def row_sums(self, values: np.ndarray) -> np.ndarray:
+        return np.bincount(self.rows, values, self.size) + np.bincount(
+            self.cols, values, self.size
+        )
+
+    def connection_weights(self) -> np.ndarray:
+        # Row sums of the full symmetric matrix.
+        return self._unscaled(self.row_sums(self.counts).astype(self.counts.dtype))
+
+    def degrees(self) -> np.ndarray:
+        return np.bincount(self.rows, minlength=self.size) + np.bincount(
+            self.cols, minlength=self.size
+        )
+
+    def between(self, nodes: np.ndarray) -> np.ndarray:
+        # Mask of the entries whose both ends are in nodes.
+        mask = np.zeros(self.size, dtype=bool)
+        mask[nodes] = True
+        return mask[self.rows] & mask[self.cols]
+
+
+# Accumulates packed pair keys (with optional integer weights) in batches;
+# each batch is reduced to a sorted run of distinct keys and runs are merged
+# once there are more than MAX_RUNS.
+@dataclass
+class CooccurrenceCounter:
+    batch_pairs: int = PAIR_BATCH
+    pending: List[np.ndarray] = field(default_factory=list)
+    # None for keys that count once each.
+    pending_weights: List[Optional[np.ndarray]] = field(default_factory=list)
+    pending_pairs: int = 0
+    runs: List[NgramTable] = field(default_factory=list)
+
+    def add(self, keys: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        self.pending.append(keys)
+        self.pending_weights.append(weights)
+        self.pending_pairs += len(keys)
+        if self.pending_pairs >= self.batch_pairs:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.pending:
+            keys = np.concatenate(self.pending)
+            if any(weights is not None for weights in self.pending_weights):
+                weights = np.concatenate(
+                    [
+                        np.ones(len(part), dtype=np.int64) if part_weights is None else part_weights
+                        for part, part_weights in zip(self.pending, self.pending_weights)
+                    ]
+                )
+                run = merge_tables([NgramTable(keys, weights)])
+            else:
+                run = NgramTable.from_keys(keys)
+            self.runs.append(run)
+            self.pending = []
+            self.pending_weights = []
+            self.pending_pairs = 0
+        if len(self.runs) > MAX_RUNS:
+            self.runs = [merge_tables(self.runs)]
+
+    def table(self) -> NgramTable:
+        self._flush()
+        self.runs = [merge_tables(self.runs)]
+        return self.runs[0]
+
+    def matrix(self, size: int, scale: int = 1) -> CooccurrenceMatrix:
+        return CooccurrenceMatrix.from_table(self.table(), size, scale)
+
+
+def _log_ratio_term(observed: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(observed > 0, observed * np.log(observed / expected), 0.0)
+
+
+def association_scores(matrix: CooccurrenceMatrix) -> Dict[str, np.ndarray]:
+    # Scores of every stored pair, taken from the full symmetric table: the
+    # total counts each pair in both directions and the row sums are the
+    # marginals. The log-likelihood ratio is signed, negative when the pair
+    # occurs less often than expected.
+    observed = matrix.weights().astype(np.float64)
+    marginals = matrix.connection_weights().astype(np.float64)
+    total = 2.0 * observed.sum()
+    row = marginals[matrix.rows]
+    col = marginals[matrix.cols]
+    expected = row * col / total
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pmi = np.log(observed / expected)
+        joint = np.log(observed / total)
+        npmi = np.where(joint < 0, pmi / -joint, 1.0)
+    llr = 2.0 * (
+        _log_ratio_term(observed, expected)
+        + _log_ratio_term(row - observed, row - expected)
+        + _log_ratio_term(col - observed, col - expected)
+        + _log_ratio_term(total - row - col + observed, total - row - col + expected)
+    )
+    return {
+        "pmi": pmi,
+        "npmi": npmi,
+        "llr": np.copysign(np.maximum(llr, 0.0), observed - expected),
+        "t_score": (observed - expected) / np.sqrt(observed),
+    }
+
+
+# Unigram counts and the co-occurrence matrix of one scan, with the settings
+# they were counted with.
+@dataclass
+class NeighborStats:
+    vocabulary: Vocabulary
+    # Occurrences per vocabulary id.
+    token_counts: np.ndarray
+    neighbors: CooccurrenceMatrix
+    metadata: dict
+
+    def save(self, root: Path, key: dict) -> None:
+        # Same layout as the corpus store: arrays first, the manifest last.
+        root.mkdir(parents=True, exist_ok=True)
+        manifest_path = root / MANIFEST_FILENAME
+        if manifest_path.exists():
+            manifest_path.unlink()
+        self.vocabulary.save(root / VOCAB_FILENAME)
+        save_array(root / TOKEN_COUNTS_FILENAME, self.token_counts)
+        neighbors = self.neighbors
+        save_array(root / PAIR_FILENAMES["rows"], neighbors.rows.astype(PAIR_ID_DTYPE))
+        save_array(root / PAIR_FILENAMES["cols"], neighbors.cols.astype(PAIR_ID_DTYPE))
+        save_array(root / PAIR_FILENAMES["counts"], neighbors.counts)
+        manifest = {
+            "version": NEIGHBOR_STATS_VERSION,
+            "key": key,
+            "vocab_size": len(self.vocabulary),
+            "pairs": len(neighbors),
+            "scale": neighbors.scale,
+            "metadata": self.metadata,
+        }
+        tmp_path = manifest_path.with_name(f"{MANIFEST_FILENAME}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    @classmethod
+    def load(cls, root: Path, key: dict) -> Optional["NeighborStats"]:
+        # None unless the cache was written for the same key.
+        manifest_path = root / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return None
+        with manifest_path.open(encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if manifest.get("version") != NEIGHBOR_STATS_VERSION or manifest.get("key") != key:
+            return None
+        vocabulary = Vocabulary.load(root / VOCAB_FILENAME)
+        token_counts = np.load(root / TOKEN_COUNTS_FILENAME)
+        rows, cols, counts = (
+            np.load(root / PAIR_FILENAMES[name]) for name in ("rows", "cols", "counts")
+        )
+        if len(vocabulary) != manifest["vocab_size"] or len(counts) != manifest["pairs"]:
+            return None
+        neighbors = CooccurrenceMatrix(
+            len(vocabulary),
+            rows.astype(np.int64),
+            cols.astype(np.int64),
+            counts,
+            manifest["scale"],
+        )
+        return cls(vocabulary, token_counts, neighbors, dict(manifest["metadata"]))
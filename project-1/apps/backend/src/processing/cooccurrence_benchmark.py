@@ -0,0 +1,78 @@
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from common import TARGET_TOKEN_COUNT, save_lemma_cache
+from cooccurrence import MAX_WEIGHTED_WINDOW, NeighborStats
+from language_core import collect_neighbor_stats
+
+
+def _timed_stats(
+    target: int, window: int, weighted: bool, workers: int
+) -> Tuple[NeighborStats, float]:
+    started = time.perf_counter()
+    stats = collect_neighbor_stats(target, window, weighted, workers=workers)
+    return stats, time.perf_counter() - started
+
+
+def _differences(expected: NeighborStats, actual: NeighborStats) -> List[str]:
+    differences = []
+    if expected.metadata != actual.metadata:
+        differences.append("metadane")
+    if expected.vocabulary.words != actual.vocabulary.words:
+        differences.append("słownik")
+    if not np.array_equal(expected.token_counts, actual.token_counts):
+        differences.append("liczności słów")
+    for name in ("rows", "cols", "counts"):
+        if not np.array_equal(
+            getattr(expected.neighbors, name), getattr(actual.neighbors, name)
+        ):
+            differences.append(f"macierz sąsiedztwa ({name})")
+    return differences
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Porównuje sekwencyjne i równoległe zliczanie sąsiedztw dla grafu "
+            "language core i mierzy przyspieszenie."
+        )
+    )
+    parser.add_argument("--target-unique", type=int, default=TARGET_TOKEN_COUNT)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--window", type=int, default=1)
+    parser.add_argument("--distance-weighting", action="store_true")
+    args = parser.parse_args()
+    if args.window < 1:
+        parser.error("--window musi być dodatnie.")
+    if args.distance_weighting and args.window > MAX_WEIGHTED_WINDOW:
+        parser.error(
+            f"--distance-weighting działa z --window nie większym niż {MAX_WEIGHTED_WINDOW}."
+        )
+
+    serial, serial_time = _timed_stats(
+        args.target_unique, args.window, args.distance_weighting, 1
+    )
+    parallel, parallel_time = _timed_stats(
+        args.target_unique, args.window, args.distance_weighting, args.workers
+    )
+    save_lemma_cache()
+    differences = _differences(serial, parallel)
+
+    print(
+        f"Artykuły: {serial.metadata['articles_used']}, "
+        f"lematy: {serial.metadata['unique_words_observed']}, "
+        f"pary: {serial.metadata['neighbor_pairs']}"
+    )
+    print(f"Sekwencyjnie:   {serial_time:.3f} s")
+    print(f"Równolegle ({args.workers}): {parallel_time:.3f} s")
+    print(f"Przyspieszenie: {serial_time / parallel_time:.2f}x")
+    print(f"Rozbieżności: {', '.join(differences) if differences else 'brak'}")
+    if differences:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 import argparse
 
-from common import corpus_path, load_or_build_corpus
+from common import (
+    TARGET_TOKEN_COUNT,
+    corpus_path,
+    describe_dump_reads,
+    describe_lemma_cache,
+    load_or_build_corpora,
+)
 
 
 def main() -> None:
@@ -12,12 +18,45 @@ def main() -> None:
         action="store_true",
         help="Przebudowuje korpus ignorujƈc wcze�>niej zapisany plik.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Liczba procesów parsujących artykuły (1 = tryb sekwencyjny).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Wznawia budowę korpusu od ostatniego punktu kontrolnego, jeśli istnieje.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[TARGET_TOKEN_COUNT],
+        help=(
+            "Docelowe rozmiary korpusu; wszystkie powstają w jednym przebiegu dumpu "
+            "jako migawki zapisywane po osiągnięciu każdego progu."
+        ),
+    )
     args = parser.parse_args()
+    if min(args.sizes) < 1:
+        parser.error("Rozmiary korpusu muszą być dodatnie.")
 
-    result = load_or_build_corpus(force_rebuild=args.force)
-    path = corpus_path()
-    print(f"Zapisano korpus ({result.metadata['token_count']} tokenƈw) do: {path}")
-    print(f"Metadane: {result.metadata}")
+    results = load_or_build_corpora(
+        args.sizes,
+        force_rebuild=args.force,
+        refresh_store=args.force and not args.resume,
+        workers=args.workers,
+        resume=args.resume,
+    )
+    for size, result in sorted(results.items()):
+        path = corpus_path(size)
+        print(f"Zapisano korpus ({result.metadata['token_count']} tokenƈw) do: {path}")
+        print(f"Metadane: {result.metadata}")
+    for summary in (describe_dump_reads(), describe_lemma_cache()):
+        if summary:
+            print(summary)
 
 
 if __name__ == "__main__":
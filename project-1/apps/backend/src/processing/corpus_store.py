@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from vocabulary import Vocabulary
+
+CORPUS_STORE_VERSION = 1
+VOCAB_FILENAME = "vocab.txt"
+TOKEN_IDS_FILENAME = "token_ids.npy"
+COUNTS_FILENAME = "counts.npy"
+HEAPS_FILENAME = "heaps.npy"
+# DocumentTerms field -> file name
+DOCUMENT_FILENAMES = {
+    "offsets": "doc_offsets.npy",
+    "term_ids": "doc_term_ids.npy",
+    "term_counts": "doc_term_counts.npy",
+    "positions": "doc_positions.npy",
+    "document_counts": "document_counts.npy",
+}
+MANIFEST_FILENAME = "manifest.json"
+TOKEN_ID_DTYPE = np.uint32
+COUNT_DTYPE = np.int64
+
+
+def save_array(path: Path, values: np.ndarray) -> None:
+    # Replacing the file instead of rewriting it keeps arrays that are still
+    # memory-mapped from the previous version valid.
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("wb") as handle:
+        np.save(handle, values)
+    os.replace(tmp_path, path)
+
+
+# Per-article term counts in CSR layout: the terms of article i are
+# term_ids[offsets[i]:offsets[i + 1]]. positions holds each article's
+# (file index, byte offset) and document_counts the number of articles
+# containing each vocabulary word.
+@dataclass
+class DocumentTerms:
+    offsets: np.ndarray
+    term_ids: np.ndarray
+    term_counts: np.ndarray
+    positions: np.ndarray
+    document_counts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+# Corpus as integer ids into a vocabulary. counts[i] is the number of
+# occurrences of vocabulary word i in the scanned articles. heaps holds
+# (total tokens, unique lemmas) rows of the vocabulary growth curve.
+@dataclass
+class CorpusResult:
+    vocabulary: Vocabulary
+    token_ids: np.ndarray
+    metadata: dict
+    counts: Optional[np.ndarray] = None
+    heaps: Optional[np.ndarray] = None
+    documents: Optional[DocumentTerms] = None
+
+    @property
+    def tokens(self) -> List[str]:
+        return self.vocabulary.decode(self.token_ids.tolist())
+
+    @property
+    def frequencies(self) -> Optional[Counter[str]]:
+        if self.counts is None:
+            return None
+        return Counter(dict(zip(self.vocabulary.words, self.counts.tolist())))
+
+    @property
+    def total_count(self) -> int:
+        return int(self.counts.sum()) if self.counts is not None else len(self.token_ids)
+
+    def iter_most_common(self) -> Iterator[Tuple[str, int]]:
+        if self.counts is None:
+            yield from Counter(self.tokens).most_common()
+            return
+        # Stable sort keeps ties in vocabulary order, like Counter.most_common().
+        order = np.argsort(-self.counts, kind="stable")
+        words = self.vocabulary.words
+        counts = self.counts[order].tolist()
+        for index, count in zip(order.tolist(), counts):
+            yield words[index], count
+
+    def most_common(self) -> List[Tuple[str, int]]:
+        return list(self.iter_most_common())
+
+    def save(self, root: Path) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        manifest_path = root / MANIFEST_FILENAME
+        # The manifest is written last and removed first, so a partially
+        # written directory is never loaded.
+        if manifest_path.exists():
+            manifest_path.unlink()
+        self.vocabulary.save(root / VOCAB_FILENAME)
+        save_array(
+            root / TOKEN_IDS_FILENAME, self.token_ids.astype(TOKEN_ID_DTYPE, copy=False)
+        )
+        counts_path = root / COUNTS_FILENAME
+        if self.counts is not None:
+            save_array(counts_path, self.counts.astype(COUNT_DTYPE, copy=False))
+        elif counts_path.exists():
+            counts_path.unlink()
+        heaps_path = root / HEAPS_FILENAME
+        if self.heaps is not None:
+            save_array(heaps_path, self.heaps.astype(COUNT_DTYPE, copy=False))
+        elif heaps_path.exists():
+            heaps_path.unlink()
+        for name, filename in DOCUMENT_FILENAMES.items():
+            if self.documents is not None:
+                save_array(root / filename, getattr(self.documents, name))
+            elif (root / filename).exists():
+                (root / filename).unlink()
+        manifest = {
+            "version": CORPUS_STORE_VERSION,
+            "vocab_size": len(self.vocabulary),
+            "token_count": int(len(self.token_ids)),
+            "has_counts": self.counts is not None,
+            "has_heaps": self.heaps is not None,
+            "has_documents": self.documents is not None,
+            "metadata": self.metadata,
+        }
+        tmp_path = manifest_path.with_name(f"{MANIFEST_FILENAME}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    @classmethod
+    def load(cls, root: Path) -> Optional["CorpusResult"]:
+        manifest_path = root / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return None
+        with manifest_path.open(encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if manifest.get("version") != CORPUS_STORE_VERSION:
+            return None
+        vocabulary = Vocabulary.load(root / VOCAB_FILENAME)
+        token_ids = np.load(root / TOKEN_IDS_FILENAME, mmap_mode="r")
+        counts = None
+        if manifest.get("has_counts"):
+            counts = np.load(root / COUNTS_FILENAME, mmap_mode="r")
+        heaps = None
+        if manifest.get("has_heaps"):
+            heaps = np.load(root / HEAPS_FILENAME)
+        documents = None
+        if manifest.get("has_documents"):
+            documents = DocumentTerms(
+                **{
+                    name: np.load(root / filename, mmap_mode="r")
+                    for name, filename in DOCUMENT_FILENAMES.items()
+                }
+            )
+        if (
+            len(vocabulary) != manifest["vocab_size"]
+            or len(token_ids) != manifest["token_count"]
+        ):
+            return None
+        return cls(
+            vocabulary, token_ids, dict(manifest["metadata"]), counts, heaps, documents
+        )
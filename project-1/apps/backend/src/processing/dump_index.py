@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dump_reader import is_compressed, open_dump
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"PJNIDX01"
+# magic, source size, source mtime (ns), entry count
+_HEADER = struct.Struct("<8sQQQ")
+# The first "identifier" key of an Enterprise dump line is the article id.
+IDENTIFIER_RE = re.compile(rb'"identifier"\s*:\s*(\d+)')
+MISSING_IDENTIFIER = -1
+
+
+@dataclass
+class IndexEntry:
+    offset: int
+    length: int
+    identifier: int
+
+
+def index_path(source: Path) -> Path:
+    return source.with_name(source.name + INDEX_SUFFIX)
+
+
+def _source_signature(source: Path) -> Tuple[int, int]:
+    stat = source.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _open_map(handle) -> Optional[mmap.mmap]:
+    try:
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file
+        return None
+
+
+def _iter_stream_lines(
+    source: Path, start: int, end: Optional[int]
+) -> Iterator[Tuple[int, bytes]]:
+    # Offsets of compressed files refer to the decompressed stream, so seeking
+    # means decompressing up to the offset.
+    with open_dump(source) as handle:
+        handle.seek(start)
+        offset = start
+        for line in handle:
+            if end is not None and offset >= end:
+                return
+            yield offset, line
+            offset += len(line)
+
+
+def iter_range_lines(
+    source: Path, start: int, end: Optional[int]
+) -> Iterator[Tuple[int, bytes]]:
+    if is_compressed(source):
+        yield from _iter_stream_lines(source, start, end)
+        return
+    with source.open("rb") as handle:
+        mapped = _open_map(handle)
+        if mapped is None:
+            return
+        with mapped:
+            end = len(mapped) if end is None else end
+            offset = start
+            while offset < end:
+                newline = mapped.find(b"\n", offset, end)
+                stop = end if newline == -1 else newline + 1
+                yield offset, mapped[offset:stop]
+                offset = stop
+
+
+# Sidecar index of the non-blank lines (articles) of one NDJSON file:
+# byte offsets, lengths and article identifiers. Plain files are read through
+# mmap; for compressed files the offsets address the decompressed stream.
+class DumpIndex:
+    def __init__(
+        self,
+        source: Path,
+        offsets: array,
+        lengths: array,
+        identifiers: array,
+    ) -> None:
+        self.source = source
+        self.offsets = offsets
+        self.lengths = lengths
+        self.identifiers = identifiers
+        self._by_identifier: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def data_bytes(self) -> int:
+        if not self.offsets:
+            return 0
+        return self.end_offset(len(self) - 1)
+
+    @classmethod
+    def build(cls, source: Path) -> "DumpIndex":
+        offsets = array("Q")
+        lengths = array("I")
+        identifiers = array("q")
+        for offset, line in iter_range_lines(source, 0, None):
+            if not line.strip():
+                continue
+            match = IDENTIFIER_RE.search(line)
+            offsets.append(offset)
+            lengths.append(len(line))
+            identifiers.append(int(match.group(1)) if match else MISSING_IDENTIFIER)
+        return cls(source, offsets, lengths, identifiers)
+
+    def save(self) -> Path:
+        size, mtime = _source_signature(self.source)
+        path = index_path(self.source)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(_HEADER.pack(INDEX_MAGIC, size, mtime, len(self)))
+            handle.write(self.offsets.tobytes())
+            handle.write(self.lengths.tobytes())
+            handle.write(self.identifiers.tobytes())
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, source: Path) -> Optional["DumpIndex"]:
+        path = index_path(source)
+        if not path.exists():
+            return None
+        with path.open("rb") as handle:
+            header = handle.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, size, mtime, count = _HEADER.unpack(header)
+            if magic != INDEX_MAGIC or (size, mtime) != _source_signature(source):
+                return None
+            offsets = array("Q")
+            lengths = array("I")
+            identifiers = array("q")
+            offsets.fromfile(handle, count)
+            lengths.fromfile(handle, count)
+            identifiers.fromfile(handle, count)
+        return cls(source, offsets, lengths, identifiers)
+
+    @classmethod
+    def open(cls, source: Path) -> "DumpIndex":
+        index = cls.load(source)
+        if index is None:
+            index = cls.build(source)
+            index.save()
+        return index
+
+    def entry(self, number: int) -> IndexEntry:
+        return IndexEntry(
+            self.offsets[number], self.lengths[number], self.identifiers[number]
+        )
+
+    def read(self, number: int) -> bytes:
+        offset = self.offsets[number]
+        if is_compressed(self.source):
+            with open_dump(self.source) as handle:
+                handle.seek(offset)
+                return handle.read(self.lengths[number])
+        with self.source.open("rb") as handle:
+            mapped = _open_map(handle)
+            with mapped:
+                return mapped[offset:self.end_offset(number)]
+
+    def end_offset(self, number: int) -> int:
+        return self.offsets[number] + self.lengths[number]
+
+    def find(self, identifier: int) -> Optional[int]:
+        if self._by_identifier is None:
+            self._by_identifier = {
+                value: number
+                for number, value in enumerate(self.identifiers)
+                if value != MISSING_IDENTIFIER
+            }
+        return self._by_identifier.get(identifier)
+
+    def number_at(self, offset: int) -> int:
+        # Number of the first article starting at or after the given byte offset.
+        return bisect_left(self.offsets, offset)
+
+    def iter_lines(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, bytes]]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        yield from iter_range_lines(
+            self.source, self.offsets[start], self.end_offset(stop - 1)
+        )
+
+    def shards(self, count: int) -> List[Tuple[int, int]]:
+        # Article ranges [start, stop) holding roughly the same number of bytes.
+        if not self.offsets:
+            return []
+        total = self.data_bytes
+        bounds = [0]
+        for shard in range(1, count):
+            number = bisect_right(self.offsets, total * shard // count)
+            if bounds[-1] < number < len(self):
+                bounds.append(number)
+        bounds.append(len(self))
+        return list(zip(bounds, bounds[1:]))
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Set, Tuple
+
+DUMP_PATTERNS = ("*.ndjson", "*.ndjson.gz", "*.ndjson.bz2", "*.ndjson.xz")
+READ_BUFFER_SIZE = 4 << 20
+
+_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix in _OPENERS
+
+
+def find_dump_files(root: Path) -> List[Path]:
+    files = {path for pattern in DUMP_PATTERNS for path in root.glob(f"**/{pattern}")}
+    # Prefer an already decompressed copy over its archive.
+    return sorted(
+        path
+        for path in files
+        if not (is_compressed(path) and path.with_suffix("") in files)
+    )
+
+
+def open_dump(path: Path) -> BinaryIO:
+    opener = _OPENERS.get(path.suffix)
+    if opener is None:
+        return path.open("rb", buffering=READ_BUFFER_SIZE)
+    return io.BufferedReader(opener(path, "rb"), buffer_size=READ_BUFFER_SIZE)
+
+
+@dataclass
+class ReadStats:
+    bytes_read: int = 0
+    read_seconds: float = 0.0
+    files_opened: int = 0
+    compressed_files: int = 0
+    started_at: float = 0.0
+    # Files are counted once, however many byte ranges are read from them.
+    paths: Set[str] = field(default_factory=set)
+
+    def start(self) -> None:
+        if not self.started_at:
+            self.started_at = time.perf_counter()
+
+    def record_open(self, path: Path) -> None:
+        self.start()
+        if str(path) in self.paths:
+            return
+        self.paths.add(str(path))
+        self.files_opened += 1
+        if is_compressed(path):
+            self.compressed_files += 1
+
+    def merge(self, other: "ReadStats") -> None:
+        # Reads made by a pool worker. Their times are summed, so with several
+        # workers the read time can exceed the elapsed time.
+        self.bytes_read += other.bytes_read
+        self.read_seconds += other.read_seconds
+        for path in sorted(other.paths):
+            self.record_open(Path(path))
+
+    @property
+    def throughput(self) -> float:
+        return self.bytes_read / self.read_seconds if self.read_seconds else 0.0
+
+    def describe(self) -> str:
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        share = self.read_seconds / elapsed if elapsed else 0.0
+        return (
+            f"Odczyt dumpu: {self.bytes_read / 1_000_000:.1f} MB "
+            f"z {self.files_opened} plików ({self.compressed_files} skompresowanych) "
+            f"w {self.read_seconds:.2f} s ({self.throughput / 1_000_000:.1f} MB/s), "
+            f"{share:.0%} czasu przetwarzania"
+        )
+
+
+def iter_timed_lines(handle: BinaryIO, stats: ReadStats) -> Iterator[bytes]:
+    # Only time spent inside readline() is counted, i.e. disk read plus
+    # decompression, so it can be compared with the parsing time around it.
+    clock = time.perf_counter
+    readline = handle.readline
+    while True:
+        started = clock()
+        line = readline()
+        stats.read_seconds += clock() - started
+        if not line:
+            return
+        stats.bytes_read += len(line)
+        yield line
+
+
+def iter_timed_ranges(
+    lines: Iterator[Tuple[int, bytes]], stats: ReadStats
+) -> Iterator[Tuple[int, bytes]]:
+    # Same accounting for (offset, line) pairs read through a dump index.
+    clock = time.perf_counter
+    while True:
+        started = clock()
+        item = next(lines, None)
+        stats.read_seconds += clock() - started
+        if item is None:
+            return
+        stats.bytes_read += len(item[1])
+        yield item
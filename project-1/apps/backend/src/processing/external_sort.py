@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import heapq
+from contextlib import ExitStack, closing
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Rough size of one dict entry holding a short str key and an int count.
+COUNT_ENTRY_BYTES = 128
+
+
+def entries_for_memory(memory_limit_mb: float) -> int:
+    return max(1, int(memory_limit_mb * 1024 * 1024 / COUNT_ENTRY_BYTES))
+
+
+# Runs are text files of "word<TAB>count" lines. Lemmas never contain tabs or
+# newlines, so no escaping is needed.
+def write_run(path: Path, items: Iterable[Tuple[str, int]]) -> Path:
+    with path.open("w", encoding="utf-8", newline="\n") as handle:
+        for word, count in items:
+            handle.write(f"{word}\t{count}\n")
+    return path
+
+
+def read_run(path: Path) -> Iterator[Tuple[str, int]]:
+    with path.open(encoding="utf-8", newline="\n") as handle:
+        for line in handle:
+            word, count = line.rstrip("\n").split("\t")
+            yield word, int(count)
+
+
+class RunWriter:
+    # Numbered run files in one directory, each sorted before it is written.
+    def __init__(self, directory: Path, prefix: str) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.paths: List[Path] = []
+
+    def write(
+        self,
+        items: Iterable[Tuple[str, int]],
+        key: Optional[Callable[[Tuple[str, int]], object]] = None,
+    ) -> Path:
+        path = self.directory / f"{self.prefix}-{len(self.paths):05d}.tsv"
+        self.paths.append(write_run(path, sorted(items, key=key)))
+        return path
+
+
+def merge_runs(
+    paths: List[Path], key: Optional[Callable[[Tuple[str, int]], object]] = None
+) -> Iterator[Tuple[str, int]]:
+    # k-way merge of runs that are each sorted by `key`.
+    with ExitStack() as stack:
+        runs = [stack.enter_context(closing(read_run(path))) for path in paths]
+        yield from heapq.merge(*runs, key=key)
+
+
+def merge_counts(paths: List[Path]) -> Iterator[Tuple[str, int]]:
+    # Runs sorted by word -> one (word, total count) per word, in word order.
+    for word, group in groupby(merge_runs(paths), key=lambda item: item[0]):
+        yield word, sum(count for _, count in group)
+
+
+def external_sort(
+    items: Iterable[Tuple[str, int]],
+    key: Callable[[Tuple[str, int]], object],
+    max_entries: int,
+    writer: RunWriter,
+) -> Tuple[int, Iterator[Tuple[str, int]]]:
+    # Sorts a stream larger than memory. The input is consumed right away,
+    # spilling sorted runs of max_entries items; returns the item count and an
+    # iterator that merges the runs back lazily.
+    first = len(writer.paths)
+    count = 0
+    buffer: List[Tuple[str, int]] = []
+    for item in items:
+        count += 1
+        buffer.append(item)
+        if len(buffer) >= max_entries:
+            writer.write(buffer, key=key)
+            buffer = []
+    if len(writer.paths) == first:
+        return count, iter(sorted(buffer, key=key))
+    if buffer:
+        writer.write(buffer, key=key)
+    return count, merge_runs(writer.paths[first:], key=key)
@@ -1,6 +1,27 @@
 import argparse
 
-from common import frequency_path, load_or_build_frequency
+from common import (
+    TARGET_TOKEN_COUNT,
+    build_approximate_frequency,
+    build_frequency,
+    build_sharded_frequency,
+    export_frequency_shards,
+    frequency_shards_path,
+    frequency_path,
+    json_output_path,
+    load_or_build_corpora,
+    open_frequency_view,
+    read_json,
+    save_lemma_cache,
+)
+from frequency_sketch import SKETCH_DEPTH, SKETCH_WIDTH
+from table_shards import SHARD_ROWS
+
+
+def _table_mode(metadata: dict) -> str:
+    if metadata.get("approximate"):
+        return "approximate"
+    return metadata.get("mode", "corpus")
 
 
 def main() -> None:
@@ -12,13 +33,158 @@ def main() -> None:
         action="store_true",
         help="Przelicza tabel�t cz�tsto�>ci ignorujƈc wcze�>niejsze wyniki.",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Zapisuje JSON bez wcięć (mniejszy plik).",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Kompresuje wynik gzipem (plik .json.gz).",
+    )
+    parser.add_argument(
+        "--approximate",
+        action="store_true",
+        help=(
+            "Liczy częstości dla całego dumpu w stałej pamięci (count-min sketch "
+            "i Misra-Gries) zamiast dokładnie dla korpusu."
+        ),
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=100_000,
+        help="Liczba najczęstszych słów w tabeli przybliżonej.",
+    )
+    parser.add_argument("--sketch-width", type=int, default=SKETCH_WIDTH)
+    parser.add_argument("--sketch-depth", type=int, default=SKETCH_DEPTH)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Liczba procesów parsujących dump w trybie przybliżonym i map-reduce.",
+    )
+    parser.add_argument(
+        "--map-reduce",
+        action="store_true",
+        help=(
+            "Liczy dokładne częstości dla całego dumpu: procesy zliczają fragmenty "
+            "dumpu, zapisują posortowane częściowe wyniki na dysk i scalają je."
+        ),
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        default=512.0,
+        help="Limit pamięci liczników w trybie map-reduce (MB, dzielony między procesy).",
+    )
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help=(
+            "Zapisuje tabelę także do bazy SQLite w data/processed (wyszukiwanie "
+            "po słowie, prefiksie i zakresie rang bez wczytywania JSON)."
+        ),
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[TARGET_TOKEN_COUNT],
+        help=(
+            "Rozmiary korpusu (liczba unikalnych lematów), dla których powstają "
+            "osobne tabele; brakujące korpusy są budowane w jednym przebiegu dumpu."
+        ),
+    )
+    parser.add_argument(
+        "--shard-rows",
+        type=int,
+        default=SHARD_ROWS,
+        help="Liczba wierszy w jednym fragmencie tabeli dla frontendu (0 = bez fragmentów).",
+    )
     args = parser.parse_args()
+    if args.approximate and args.map_reduce:
+        parser.error("--approximate i --map-reduce wykluczają się.")
+    mode = "approximate" if args.approximate else "map_reduce" if args.map_reduce else "corpus"
+    sizes = sorted(set(args.sizes))
+    if mode != "corpus" and sizes != [TARGET_TOKEN_COUNT]:
+        parser.error("--sizes działa tylko z tabelą liczoną z korpusu.")
 
-    payload = load_or_build_frequency(force_rebuild=args.force)
-    path = frequency_path()
-    total = payload["metadata"]["total_tokens"]
-    unique = payload["metadata"]["unique_words"]
-    print(f"Tabela cz�tsto�>ci: {unique} unikalnych s�'ƈw z {total} tokenƈw -> {path}")
+    paths = {size: json_output_path(frequency_path(size), args.gzip) for size in sizes}
+    tables = {}
+    for size, path in paths.items():
+        metadata = read_json(path)["metadata"] if path.exists() and not args.force else None
+        if size == TARGET_TOKEN_COUNT and args.sqlite:
+            view = open_frequency_view()
+            if view is None:
+                metadata = None
+            else:
+                view.close()
+        if metadata is not None and _table_mode(metadata) == mode:
+            tables[size] = metadata
+    missing = [size for size in sizes if size not in tables]
+    if missing:
+        if args.map_reduce:
+            tables[TARGET_TOKEN_COUNT] = build_sharded_frequency(
+                workers=args.workers,
+                memory_limit_mb=args.memory_limit,
+                compact=args.compact,
+                compress=args.gzip,
+                sqlite=args.sqlite,
+            )
+        elif args.approximate:
+            tables[TARGET_TOKEN_COUNT] = build_approximate_frequency(
+                args.top_k,
+                sketch_width=args.sketch_width,
+                sketch_depth=args.sketch_depth,
+                workers=args.workers,
+                compact=args.compact,
+                compress=args.gzip,
+                sqlite=args.sqlite,
+            )
+        else:
+            corpora = load_or_build_corpora(missing, force_rebuild=args.force)
+            for size in missing:
+                tables[size] = build_frequency(
+                    compact=args.compact,
+                    compress=args.gzip,
+                    sqlite=args.sqlite,
+                    target_tokens=size,
+                    corpus=corpora[size],
+                )
+        save_lemma_cache()
+    for size in sizes:
+        total = tables[size]["total_tokens"]
+        unique = tables[size].get("unique_words")
+        if unique is None:
+            # Approximate tables only estimate the number of distinct words.
+            estimate = tables[size].get("unique_words_estimate")
+            unique = "?" if estimate is None else f"~{estimate}"
+        path = paths[size]
+        print(f"Tabela cz�tsto�>ci: {unique} unikalnych s�'ƈw z {total} tokenƈw -> {path}")
+    metadata = tables.get(TARGET_TOKEN_COUNT, {})
+    if metadata.get("approximate"):
+        bounds = metadata["error_bounds"]
+        print(
+            f"Tryb przybliżony: zawyżenie <= {bounds['max_overcount']:.1f} "
+            f"(p >= {1 - bounds['delta']:.3f}), zaniżenie <= {bounds['max_undercount']}"
+        )
+        if "rows" in metadata:
+            print(
+                f"Wiersze tabeli: {metadata['rows']} z {metadata['candidates']} kandydatów"
+            )
+    elif metadata.get("mode") == "map_reduce":
+        print(
+            f"Map-reduce: {metadata['shards']} fragmentów, "
+            f"{metadata['spilled_runs']} plików pośrednich"
+        )
+    if args.shard_rows > 0 and TARGET_TOKEN_COUNT in tables:
+        manifest = export_frequency_shards(args.shard_rows)
+        print(
+            f"Fragmenty tabeli: {len(manifest['shards'])} po {args.shard_rows} wierszy "
+            f"-> {frequency_shards_path()}"
+        )
 
 
 if __name__ == "__main__":
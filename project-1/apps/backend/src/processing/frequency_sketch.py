@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SKETCH_WIDTH = 1 << 20
+SKETCH_DEPTH = 4
+SKETCH_DTYPE = np.int64
+
+
+def stable_hashes(words: List[str]) -> np.ndarray:
+    # Python's hash() is salted per process, so workers and reruns would
+    # disagree; blake2b gives the same 64-bit value everywhere.
+    digests = (
+        hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest() for word in words
+    )
+    return np.array(
+        [int.from_bytes(digest, "little") for digest in digests], dtype=np.uint64
+    )
+
+
+# Count-min sketch (Cormode & Muthukrishnan 2005). Estimates never undercount;
+# with probability 1 - delta they overcount by at most epsilon * total.
+class CountMinSketch:
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH) -> None:
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = np.zeros((depth, width), dtype=SKETCH_DTYPE)
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    @property
+    def max_overcount(self) -> float:
+        return self.epsilon * self.total
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        # Double hashing: row i uses h1 + i * h2 (Kirsch & Mitzenmacher).
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((low + rows * high) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, words: List[str], counts: np.ndarray) -> None:
+        if not words:
+            return
+        columns = self._columns(stable_hashes(words))
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts)
+        self.total += int(counts.sum())
+
+    def distinct_estimate(self) -> Optional[float]:
+        # Linear counting (Whang et al. 1990) on every row: with `empty` of the
+        # width cells still zero, about -width * ln(empty / width) distinct
+        # words were added. None once a row has no empty cell left.
+        empty = np.count_nonzero(self.table == 0, axis=1)
+        if not empty.all():
+            return None
+        return float(np.mean(-self.width * np.log(empty / self.width)))
+
+    def estimate(self, words: List[str]) -> np.ndarray:
+        if not words:
+            return np.zeros(0, dtype=SKETCH_DTYPE)
+        columns = self._columns(stable_hashes(words))
+        rows = np.arange(self.depth)[:, None]
+        return self.table[rows, columns].min(axis=0)
+
+
+# Misra-Gries heavy hitters with weighted updates. Counters never overcount;
+# each word is undercounted by at most total / (capacity + 1), so every word
+# more frequent than that is guaranteed to hold a counter.
+@dataclass
+class HeavyHitters:
+    capacity: int
+    total: int = 0
+    decremented: int = 0
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def max_undercount(self) -> int:
+        return self.decremented
+
+    def add(self, items: Iterable[Tuple[str, int]]) -> None:
+        counters = self.counters
+        for word, count in items:
+            counters[word] = counters.get(word, 0) + count
+            self.total += count
+        # Compacting only once the table doubles keeps updates amortized O(1).
+        if len(counters) > 2 * self.capacity:
+            self._compact()
+
+    def _compact(self) -> None:
+        # Subtracting the (capacity + 1)-th largest value removes at least
+        # (capacity + 1) times that value from the table, which bounds the
+        # sum of all decrements by total / (capacity + 1).
+        values = np.fromiter(self.counters.values(), dtype=np.int64, count=len(self.counters))
+        cut = int(np.partition(values, -(self.capacity + 1))[-(self.capacity + 1)])
+        self.decremented += cut
+        self.counters = {
+            word: count - cut for word, count in self.counters.items() if count > cut
+        }
+
+
+@dataclass
+class FrequencySketch:
+    top_k: int
+    sketch: CountMinSketch
+    heavy: HeavyHitters
+    article_count: int = 0
+
+    @classmethod
+    def create(
+        cls, top_k: int, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH
+    ) -> "FrequencySketch":
+        return cls(top_k, CountMinSketch(width, depth), HeavyHitters(2 * top_k))
+
+    @property
+    def total(self) -> int:
+        return self.sketch.total
+
+    def add(self, frequencies: Dict[str, int], articles: int = 1) -> None:
+        words = list(frequencies)
+        counts = np.fromiter(frequencies.values(), dtype=SKETCH_DTYPE, count=len(words))
+        self.sketch.add(words, counts)
+        self.heavy.add(frequencies.items())
+        self.article_count += articles
+
+    def most_common(self) -> List[Tuple[str, int, int]]:
+        # (word, upper bound from the sketch, lower bound from Misra-Gries) for
+        # the top_k candidates, ordered by the sketch estimate. Ties keep the
+        # counter insertion order, as with Counter.most_common().
+        words = list(self.heavy.counters)
+        estimates = self.sketch.estimate(words)
+        lower = np.fromiter(self.heavy.counters.values(), dtype=np.int64, count=len(words))
+        order = np.argsort(-estimates, kind="stable")[: self.top_k]
+        return [
+            (words[index], int(estimates[index]), int(lower[index]))
+            for index in order.tolist()
+        ]
+
+    @property
+    def candidates(self) -> int:
+        return len(self.heavy.counters)
+
+    def unique_words_estimate(self) -> Optional[int]:
+        estimate = self.sketch.distinct_estimate()
+        return None if estimate is None else round(estimate)
+
+    def error_bounds(self) -> dict:
+        return {
+            "top_k": self.top_k,
+            "sketch_width": self.sketch.width,
+            "sketch_depth": self.sketch.depth,
+            "epsilon": self.sketch.epsilon,
+            "delta": self.sketch.delta,
+            "max_overcount": self.sketch.max_overcount,
+            "heavy_hitter_capacity": self.heavy.capacity,
+            "max_undercount": self.heavy.max_undercount,
+            "guaranteed_frequency": self.total / (self.heavy.capacity + 1),
+        }
@@ -0,0 +1,108 @@
+import argparse
+import time
+from itertools import islice
+from typing import Callable, List, Tuple
+
+from common import html_to_text, iter_article_html
+
+
+# Markup that the two engines are known to treat differently unless the
+# streaming extractor mirrors BeautifulSoup; checked without a dump.
+EQUIVALENCE_CASES: List[Tuple[str, str]] = [
+    ("ruby", "<p>a <ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby> b</p>"),
+    ("template", "<p>przed</p><template><p>ukryte</p></template><p>po</p>"),
+    ("komentarz", "<p>a<!-- komentarz -->b</p><!-- <p>c</p> -->"),
+    ("encje", "<p>caf&eacute; &amp; p&atilde;o&#233;&#x41;&nbsp;x &notanentity; &lt;b&gt;</p>"),
+    (
+        "script/style",
+        "<div>a<script>var s = '<p>x</p>';</script><style>p { color: red }</style>"
+        "<noscript>b</noscript><div><script>if (1 < 2) {}</script>c</div></div>",
+    ),
+    ("cdata", "<p>a<![CDATA[b]]>c</p>"),
+    ("białe znaki", "<p>  a\n\t b </p><br/><p>c</p>\n"),
+]
+
+
+def _check_cases() -> int:
+    mismatches = 0
+    for name, html in EQUIVALENCE_CASES:
+        expected = html_to_text(html, engine="bs4")
+        actual = html_to_text(html, engine="stream")
+        if expected != actual:
+            mismatches += 1
+            print(f"[DIFF] przypadek {name!r}: bs4 {expected!r}, stream {actual!r}")
+    print(f"Przypadki stałe: {len(EQUIVALENCE_CASES)}, rozbieżności: {mismatches}")
+    return mismatches
+
+
+def _time_engine(engine: Callable[[str], str], documents: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in documents:
+            engine(html)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _first_difference(left: str, right: str) -> int:
+    for index, (a, b) in enumerate(zip(left, right)):
+        if a != b:
+            return index
+    return min(len(left), len(right))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Porównuje ekstraktor strumieniowy z BeautifulSoup na artykułach "
+            "z dumpu ptwiki i mierzy przyspieszenie."
+        )
+    )
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--show", type=int, default=5, help="Ile rozbieżności wypisać.")
+    parser.add_argument(
+        "--cases-only",
+        action="store_true",
+        help="Sprawdza tylko stałe przypadki HTML, bez dumpu.",
+    )
+    args = parser.parse_args()
+
+    if _check_cases():
+        raise SystemExit(1)
+    if args.cases_only:
+        return
+
+    documents = list(islice(iter_article_html(), args.articles))
+    if not documents:
+        raise SystemExit("Brak artykułów w dumpie.")
+
+    mismatches = 0
+    for index, html in enumerate(documents):
+        expected = html_to_text(html, engine="bs4")
+        actual = html_to_text(html, engine="stream")
+        if expected == actual:
+            continue
+        mismatches += 1
+        if mismatches <= args.show:
+            at = _first_difference(expected, actual)
+            print(f"[DIFF] artykuł {index}, znak {at}:")
+            print(f"  bs4:    {expected[max(0, at - 40):at + 40]!r}")
+            print(f"  stream: {actual[max(0, at - 40):at + 40]!r}")
+
+    total_bytes = sum(len(html.encode("utf-8")) for html in documents)
+    bs4_time = _time_engine(lambda html: html_to_text(html, engine="bs4"), documents, args.repeat)
+    stream_time = _time_engine(lambda html: html_to_text(html, engine="stream"), documents, args.repeat)
+    megabytes = total_bytes / 1_000_000
+
+    print(f"Artykuły: {len(documents)} ({megabytes:.1f} MB HTML), rozbieżności: {mismatches}")
+    print(f"bs4:    {bs4_time:.3f} s ({megabytes / bs4_time:.1f} MB/s)")
+    print(f"stream: {stream_time:.3f} s ({megabytes / stream_time:.1f} MB/s)")
+    print(f"Przyspieszenie: {bs4_time / stream_time:.2f}x")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
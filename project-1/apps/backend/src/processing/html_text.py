@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import re
+from html import unescape
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import List
+
+# BeautifulSoup keeps <template> content and ruby annotations (<rt>, <rp>) out
+# of get_text() as well.
+SKIPPED_TAGS = {"script", "style", "template", "rt", "rp"}
+WHITESPACE_RE = re.compile(r"\s+")
+# Bumped whenever the extracted text changes, so stores built from the old
+# text are not reused.
+EXTRACTOR_VERSION = 2
+
+
+# Event-driven counterpart of BeautifulSoup(html, "html.parser").get_text(" ", strip=True)
+# with script/style removed: no tree is built, text runs are stripped and joined
+# as they are closed by the next markup event.
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        # Character references are resolved by hand, like BeautifulSoup does, so
+        # that a run of text split by references still forms a single string.
+        super().__init__(convert_charrefs=False)
+        self.parts: List[str] = []
+        self._buffer: List[str] = []
+        self._skip_depth = 0
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        text = "".join(self._buffer).strip()
+        self._buffer.clear()
+        if text:
+            self.parts.append(text)
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        self._flush()
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._buffer.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        self.handle_data(unescape(f"&#{name};"))
+
+    def handle_entityref(self, name: str) -> None:
+        character = html5.get(f"{name};")
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data: str) -> None:
+        self._flush()
+
+    def handle_decl(self, decl: str) -> None:
+        self._flush()
+
+    def handle_pi(self, data: str) -> None:
+        self._flush()
+
+    def unknown_decl(self, data: str) -> None:
+        self._flush()
+        # CDATA sections count as text for get_text(), other declarations do not.
+        if data.upper().startswith("CDATA["):
+            self._buffer.append(data[len("CDATA["):])
+            self._flush()
+
+
+def extract_text(html: str) -> str:
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    extractor._flush()
+    return WHITESPACE_RE.sub(" ", " ".join(extractor.parts))
@@ -0,0 +1,57 @@
+import argparse
+
+from common import NDJSON_FILES, RAW_ROOT, article_position, read_dump_line
+from dump_index import DumpIndex, index_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Buduje indeksy przesunięć bajtowych dla plików NDJSON dumpu ptwiki."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Przebudowuje indeksy ignorując wcześniej zapisane pliki.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Wypisuje podział każdego pliku na N części o zbliżonej liczbie bajtów.",
+    )
+    parser.add_argument(
+        "--article",
+        type=int,
+        default=None,
+        help="Wypisuje pozycję i początek artykułu o podanym numerze (liczonym od 0).",
+    )
+    args = parser.parse_args()
+
+    total_articles = 0
+    for source in NDJSON_FILES:
+        index = None if args.force else DumpIndex.load(source)
+        if index is None:
+            index = DumpIndex.build(source)
+            index.save()
+        total_articles += len(index)
+        print(
+            f"{source.relative_to(RAW_ROOT)}: {len(index)} artykułów "
+            f"-> {index_path(source).name}"
+        )
+        if args.shards > 0:
+            for start, stop in index.shards(args.shards):
+                print(
+                    f"  artykuły {start}-{stop - 1}: "
+                    f"bajty {index.offsets[start]}-{index.end_offset(stop - 1)}"
+                )
+    print(f"Zaindeksowano {total_articles} artykułów w {len(NDJSON_FILES)} plikach.")
+
+    if args.article is not None:
+        file_index, offset = article_position(args.article)
+        line = read_dump_line((file_index, offset))
+        print(f"Artykuł {args.article}: {NDJSON_FILES[file_index].name} @ {offset}")
+        print(line[:200].decode("utf-8", errors="replace"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+GZIP_SUFFIX = ".gz"
+JSON_INDENT = 2
+
+
+def is_gzip_path(path: Path) -> bool:
+    return path.suffix == GZIP_SUFFIX
+
+
+def gzip_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}{GZIP_SUFFIX}")
+
+
+def _dumps(value: Any, compact: bool) -> str:
+    if compact:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(value, ensure_ascii=False, indent=JSON_INDENT)
+
+
+# Writes the same text as json.dump(value, indent=2, ensure_ascii=False), or
+# its compact form, except that iterators (generators, map objects, ...) held
+# by dicts or by other iterators are written item by item as JSON arrays.
+# Plain lists are encoded in one go.
+class JsonStreamWriter:
+    def __init__(self, handle: TextIO, compact: bool = False) -> None:
+        self.handle = handle
+        self.compact = compact
+        self._key_separator = ":" if compact else ": "
+
+    def _newline(self, level: int) -> str:
+        return "" if self.compact else "\n" + " " * (JSON_INDENT * level)
+
+    def write(self, value: Any, level: int = 0) -> None:
+        if isinstance(value, dict):
+            self._write_dict(value, level)
+        elif isinstance(value, Iterator):
+            self._write_items(value, level)
+        else:
+            text = _dumps(value, self.compact)
+            if not self.compact and level:
+                text = text.replace("\n", self._newline(level))
+            self.handle.write(text)
+
+    def _write_dict(self, value: dict, level: int) -> None:
+        write = self.handle.write
+        if not value:
+            write("{}")
+            return
+        inner = self._newline(level + 1)
+        separator = "{"
+        for key, item in value.items():
+            write(separator)
+            write(inner)
+            write(json.dumps(str(key), ensure_ascii=False))
+            write(self._key_separator)
+            self.write(item, level + 1)
+            separator = ","
+        write(self._newline(level))
+        write("}")
+
+    def _write_items(self, items: Iterator, level: int) -> None:
+        write = self.handle.write
+        inner = self._newline(level + 1)
+        separator = "["
+        for item in items:
+            write(separator)
+            write(inner)
+            self.write(item, level + 1)
+            separator = ","
+        if separator == "[":
+            write("[]")
+            return
+        write(self._newline(level))
+        write("]")
+
+
+def write_json_file(path: Path, data: Any, compact: bool = False) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        with tmp_path.open("wb") as raw:
+            stream = raw
+            if is_gzip_path(path):
+                # mtime=0 keeps the compressed bytes reproducible between runs.
+                stream = gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0)
+            with io.TextIOWrapper(stream, encoding="utf-8") as handle:
+                JsonStreamWriter(handle, compact).write(data)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+
+
+def read_json_file(path: Path) -> Any:
+    opener = gzip.open if is_gzip_path(path) else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def existing_json(path: Path) -> Optional[Path]:
+    for candidate in (path, gzip_path(path)):
+        if candidate.exists():
+            return candidate
+    return None
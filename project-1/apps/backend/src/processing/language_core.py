@@ -1,151 +1,585 @@
 import argparse
-import json
-from collections import Counter, defaultdict
-from typing import Dict, List, Set, Tuple
+import itertools
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
+
+from article_store import Article
+from checkpoint import CheckpointTimer, clear_checkpoint, load_checkpoint, save_checkpoint
 from common import (
+    CHECKPOINT_INTERVAL_SECONDS,
     LEMMA_STRATEGY,
+    MANUAL_BLOCK,
     NDJSON_FILES,
+    STOPWORDS,
     TARGET_TOKEN_COUNT,
-    html_to_text,
+    checkpoint_path,
+    describe_dump_reads,
+    describe_lemma_cache,
+    CountedChunk,
+    dump_fingerprint,
+    iter_articles,
+    iter_counted_chunks,
+    json_output_path,
     language_core_path,
-    tokenize,
+    language_core_sweep_path,
+    neighbor_stats_path,
+    save_lemma_cache,
+    store_graph_edges,
     write_json,
 )
+from cooccurrence import (
+    ASSOCIATION_MEASURES,
+    MAX_WEIGHTED_WINDOW,
+    CooccurrenceCounter,
+    NeighborStats,
+    association_scores,
+    distance_scale,
+    pack_pairs,
+    window_pairs,
+)
+from vocabulary import Vocabulary
+
+# Token ids collected before their counts are added up.
+TOKEN_BATCH = 1 << 20
+EDGE_SCORES = ("count", *ASSOCIATION_MEASURES)
+# Edges kept by default: positive PMI/NPMI, LLR and t-score significant at
+# p < 0.001 and p < 0.005.
+DEFAULT_MIN_SCORES = {"pmi": 0.0, "npmi": 0.0, "llr": 10.83, "t_score": 2.576}
+
+
+@dataclass
+class NeighborStatsBuilder:
+    target_unique: int
+    window: int = 1
+    weighted: bool = False
+    vocabulary: Vocabulary = field(default_factory=Vocabulary)
+    token_counts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    pending_ids: List[np.ndarray] = field(default_factory=list)
+    pending_tokens: int = 0
+    pairs: CooccurrenceCounter = field(default_factory=CooccurrenceCounter)
+    articles_used: int = 0
+    files_considered: int = 0
+    total_tokens: int = 0
+    position: Optional[Tuple[int, int]] = None
+
+    def add_article(self, article: Article) -> bool:
+        self.files_considered = article.file_index + 1
+        self.position = article.end_position
+        tokens = article.tokens
+        if not tokens:
+            return False
+        self.articles_used += 1
+        self.total_tokens += len(tokens)
+        self._add_tokens(tokens)
+        # The whole article is counted, also past the token that hit the target.
+        return len(self.vocabulary) >= self.target_unique
+
+    def _add_tokens(self, tokens: List[str]) -> None:
+        ids = np.frombuffer(self.vocabulary.encode(tokens), dtype=np.uint32)
+        self.pending_ids.append(ids)
+        self.pending_tokens += len(ids)
+        if self.pending_tokens >= TOKEN_BATCH:
+            self._count_tokens()
+        self.pairs.add(*window_pairs(ids, self.window, self.weighted))
+
+    def add_chunk(self, chunk: CountedChunk) -> bool:
+        # Merges counts made by a worker with chunk-local ids. Local ids follow
+        # first occurrence in the chunk, so mapping them in order gives the
+        # same vocabulary as adding the articles one by one.
+        counts: NeighborStats = chunk.counts
+        vocabulary = self.vocabulary
+        words = counts.vocabulary.words
+        new_words = sum(1 for word in words if word not in vocabulary)
+        if len(vocabulary) + new_words >= self.target_unique:
+            # The target falls inside this chunk: parse it again and replay it
+            # article by article so the stop matches the serial run exactly.
+            for article in chunk.parse().articles:
+                if self.add_article(article):
+                    return True
+            return False
+        mapping = np.frombuffer(vocabulary.encode(words), dtype=np.uint32).astype(np.int64)
+        self._count_tokens()
+        self.token_counts[mapping] += counts.token_counts
+        neighbors = counts.neighbors
+        self.pairs.add(
+            pack_pairs(mapping[neighbors.rows], mapping[neighbors.cols]), neighbors.counts
+        )
+        self.articles_used += chunk.article_count
+        self.total_tokens += chunk.token_count
+        self.files_considered = chunk.files_considered
+        self.position = chunk.end_position
+        return False
+
+    def _count_tokens(self) -> None:
+        counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+        counts[: len(self.token_counts)] = self.token_counts
+        if self.pending_ids:
+            ids = np.concatenate(self.pending_ids)
+            counts += np.bincount(ids, minlength=len(counts))
+        self.token_counts = counts
+        self.pending_ids = []
+        self.pending_tokens = 0
+
+    def result(self, reached_target: bool) -> NeighborStats:
+        self._count_tokens()
+        scale = distance_scale(self.window) if self.weighted else 1
+        neighbors = self.pairs.matrix(len(self.vocabulary), scale)
+        metadata = {
+            "target_unique_words": self.target_unique,
+            "unique_words_observed": len(self.vocabulary),
+            "total_tokens_observed": self.total_tokens,
+            "articles_used": self.articles_used,
+            "files_considered": (
+                self.files_considered if reached_target else len(NDJSON_FILES)
+            ),
+            "lemma_strategy": LEMMA_STRATEGY,
+            "window": self.window,
+            "distance_weighted": self.weighted,
+            "neighbor_pairs": len(neighbors),
+        }
+        # neighbors holds pairs of different lemmas at most `window` tokens
+        # apart within an article (or their summed 1/distance weights).
+        return NeighborStats(self.vocabulary, self.token_counts, neighbors, metadata)
+
+
+def _stats_key(target_unique: int, window: int, weighted: bool) -> dict:
+    return {
+        "step": "language_core",
+        "target_unique": target_unique,
+        "window": window,
+        "weighted": weighted,
+        **dump_fingerprint(),
+    }
+
+
+def _count_chunk(tokens: List[List[str]], window: int, weighted: bool) -> NeighborStats:
+    # Map step: unigram and pair counts of one chunk with chunk-local ids.
+    builder = NeighborStatsBuilder(0, window, weighted)
+    for article_tokens in tokens:
+        if article_tokens:
+            builder._add_tokens(article_tokens)
+    builder._count_tokens()
+    neighbors = builder.pairs.matrix(len(builder.vocabulary))
+    return NeighborStats(builder.vocabulary, builder.token_counts, neighbors, {})
+
+
+def _add_steps(builder: NeighborStatsBuilder, workers: int) -> Iterator[bool]:
+    # One step per article, or per chunk counted by the pool; each yields
+    # whether the target was reached.
+    if workers <= 1:
+        with closing(iter_articles(after=builder.position)) as articles:
+            for article in articles:
+                yield builder.add_article(article)
+        return
+    count = partial(_count_chunk, window=builder.window, weighted=builder.weighted)
+    with closing(iter_counted_chunks(count, workers, after=builder.position)) as chunks:
+        for chunk in chunks:
+            yield builder.add_chunk(chunk)
 
 
 def collect_neighbor_stats(
     target_unique: int,
-) -> Tuple[Counter[str], Dict[str, Counter[str]], dict]:
-    token_counts: Counter[str] = Counter()
-    neighbors: Dict[str, Counter[str]] = defaultdict(Counter)
-    unique_seen: Set[str] = set()
-    articles_used = 0
-    files_considered = 0
-    total_tokens = 0
-    reached_target = False
-
-    for ndjson_file in NDJSON_FILES:
-        files_considered += 1
-        with ndjson_file.open(encoding="utf-8") as handle:
-            for line in handle:
-                if not line.strip():
-                    continue
-                try:
-                    payload = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                article_body = payload.get("article_body") or {}
-                html = article_body.get("html")
-                if not html:
-                    continue
-                tokens = tokenize(html_to_text(html))
-                if not tokens:
-                    continue
-                articles_used += 1
-                total_tokens += len(tokens)
-                previous: str | None = None
-                for token in tokens:
-                    token_counts[token] += 1
-                    if previous and previous != token:
-                        neighbors[previous][token] += 1
-                        neighbors[token][previous] += 1
-                    previous = token
-                    if token not in unique_seen:
-                        unique_seen.add(token)
-                        if len(unique_seen) >= target_unique:
-                            reached_target = True
-                if reached_target:
-                    break
+    window: int = 1,
+    weighted: bool = False,
+    workers: int = 1,
+    resume: bool = False,
+    checkpoint_interval: float = CHECKPOINT_INTERVAL_SECONDS,
+) -> NeighborStats:
+    path = checkpoint_path("language_core")
+    key = _stats_key(target_unique, window, weighted)
+    builder = load_checkpoint(path, key) if resume else None
+    if builder is None:
+        builder = NeighborStatsBuilder(target_unique, window, weighted)
+
+    timer = CheckpointTimer(checkpoint_interval)
+    with closing(_add_steps(builder, workers)) as steps:
+        for reached_target in steps:
             if reached_target:
-                break
+                clear_checkpoint(path)
+                return builder.result(reached_target=True)
+            if timer.due():
+                save_checkpoint(path, key, builder)
+    clear_checkpoint(path)
+    return builder.result(reached_target=False)
 
-    metadata = {
-        "target_unique_words": target_unique,
-        "unique_words_observed": len(unique_seen),
-        "total_tokens_observed": total_tokens,
-        "articles_used": articles_used,
-        "files_considered": files_considered,
-        "lemma_strategy": LEMMA_STRATEGY,
-    }
-    return token_counts, neighbors, metadata
-
-
-from common import MANUAL_BLOCK, STOPWORDS
-
-def build_graph(min_frequency: int, min_connection: int, max_nodes: int) -> dict:
-    frequencies, neighbors, source_metadata = collect_neighbor_stats(TARGET_TOKEN_COUNT)
-
-    nodes: List[dict] = []
-    for word, count in frequencies.items():
-        if count < min_frequency:
-            continue
-        if word in MANUAL_BLOCK or word in STOPWORDS:
-            continue
-        neighbor_stats = neighbors.get(word)
-        if not neighbor_stats:
-            continue
-        connection_weight = sum(neighbor_stats.values())
-        if connection_weight < min_connection:
-            continue
-        nodes.append(
-            {
-                "id": word,
-                "frequency": count,
-                "unique_neighbors": len(neighbor_stats),
-                "connection_weight": connection_weight,
-            }
+
+def load_or_collect_neighbor_stats(
+    target_unique: int,
+    window: int = 1,
+    weighted: bool = False,
+    workers: int = 1,
+    resume: bool = False,
+    refresh: bool = False,
+) -> NeighborStats:
+    # Counts are cached per target size and window; the key also covers the
+    # dump files and the tokenizer, so a changed input is counted again.
+    key = _stats_key(target_unique, window, weighted)
+    path = neighbor_stats_path(target_unique, window, weighted)
+    if not refresh and not resume:
+        stats = NeighborStats.load(path, key)
+        if stats is not None:
+            return stats
+    stats = collect_neighbor_stats(
+        target_unique, window, weighted, workers=workers, resume=resume
+    )
+    save_lemma_cache()
+    stats.save(path, key)
+    return stats
+
+
+def _blocked_words(words: List[str]) -> np.ndarray:
+    return np.fromiter(
+        (word in MANUAL_BLOCK or word in STOPWORDS for word in words),
+        dtype=bool,
+        count=len(words),
+    )
+
+
+# Per-node and per-pair arrays computed once per set of neighbour statistics
+# and shared by every graph selected from it.
+@dataclass
+class GraphInputs:
+    stats: NeighborStats
+    weights: np.ndarray
+    scores: Dict[str, np.ndarray]
+    unique_neighbors: np.ndarray
+    connection_weights: np.ndarray
+    allowed: np.ndarray
+
+    @classmethod
+    def from_stats(cls, stats: NeighborStats) -> "GraphInputs":
+        neighbors = stats.neighbors
+        return cls(
+            stats,
+            neighbors.weights(),
+            association_scores(neighbors),
+            neighbors.degrees(),
+            neighbors.connection_weights(),
+            ~_blocked_words(stats.vocabulary.words),
         )
 
-    nodes.sort(key=lambda item: (item["connection_weight"], item["frequency"]), reverse=True)
-    selected_nodes = nodes[:max_nodes]
-    selected_ids: Set[str] = {node["id"] for node in selected_nodes}
-
-    edges: List[dict] = []
-    seen_edges: Set[Tuple[str, str]] = set()
-    for word in selected_ids:
-        neighbor_stats = neighbors.get(word)
-        if not neighbor_stats:
-            continue
-        for neighbor, weight in neighbor_stats.items():
-            if neighbor not in selected_ids or weight < min_connection:
-                continue
-            edge_key = tuple(sorted((word, neighbor)))
-            if edge_key in seen_edges:
-                continue
-            seen_edges.add(edge_key)
-            edges.append({"source": word, "target": neighbor, "weight": weight})
 
-    metadata = {
-        **source_metadata,
+@dataclass
+class CoreGraph:
+    # Selected node ids, strongest first.
+    nodes: np.ndarray
+    node_strength: np.ndarray
+    # Indices into the co-occurrence matrix, in output order.
+    edges: np.ndarray
+    parameters: dict
+
+
+def select_graph(
+    inputs: GraphInputs,
+    min_frequency: int,
+    min_connection: int,
+    max_nodes: int,
+    score: str = "count",
+    min_score: Optional[float] = None,
+) -> CoreGraph:
+    frequencies = inputs.stats.token_counts
+    neighbors = inputs.stats.neighbors
+    if score == "count":
+        significant = inputs.weights >= min_connection
+        strength = inputs.connection_weights
+        connected = (inputs.unique_neighbors > 0) & (strength >= min_connection)
+    else:
+        # The association score replaces the count cutoff: a node is ranked by
+        # the summed scores of its significant edges.
+        if min_score is None:
+            min_score = DEFAULT_MIN_SCORES[score]
+        significant = inputs.scores[score] >= min_score
+        strength = neighbors.row_sums(np.where(significant, inputs.scores[score], 0.0))
+        connected = strength > 0
+    candidates = np.flatnonzero((frequencies >= min_frequency) & inputs.allowed & connected)
+    # Strongest node first, then frequency; ties stay in first-seen order.
+    order = np.lexsort((candidates, -frequencies[candidates], -strength[candidates]))
+    selected = candidates[order][:max_nodes]
+
+    edges = np.flatnonzero(neighbors.between(selected) & significant)
+    if score != "count":
+        edges = edges[np.argsort(-inputs.scores[score][edges], kind="stable")]
+    parameters = {
         "min_frequency": min_frequency,
         "min_connection_weight": min_connection,
         "max_nodes": max_nodes,
+        "score": score,
+    }
+    if score != "count":
+        parameters["min_score"] = min_score
+    return CoreGraph(selected, strength[selected], edges, parameters)
+
+
+def build_graph(
+    min_frequency: int,
+    min_connection: int,
+    max_nodes: int,
+    window: int = 1,
+    weighted: bool = False,
+    score: str = "count",
+    min_score: Optional[float] = None,
+    workers: int = 1,
+    resume: bool = False,
+    refresh: bool = False,
+    compact: bool = False,
+    compress: bool = False,
+    sqlite: bool = False,
+) -> dict:
+    stats = load_or_collect_neighbor_stats(
+        TARGET_TOKEN_COUNT,
+        window,
+        weighted,
+        workers=workers,
+        resume=resume,
+        refresh=refresh,
+    )
+    inputs = GraphInputs.from_stats(stats)
+    graph = select_graph(
+        inputs, min_frequency, min_connection, max_nodes, score, min_score
+    )
+    words = stats.vocabulary.words
+    neighbors = stats.neighbors
+
+    selected = graph.nodes
+    selected_nodes = [
+        {
+            "id": words[word_id],
+            "frequency": count,
+            "unique_neighbors": degree,
+            "connection_weight": weight,
+        }
+        for word_id, count, degree, weight in zip(
+            selected.tolist(),
+            stats.token_counts[selected].tolist(),
+            inputs.unique_neighbors[selected].tolist(),
+            inputs.connection_weights[selected].tolist(),
+        )
+    ]
+    if score != "count":
+        for node, value in zip(selected_nodes, graph.node_strength.tolist()):
+            node["association_strength"] = value
+
+    entries = graph.edges
+    edges: List[Tuple[str, str, float]] = [
+        (words[source], words[target], weight)
+        for source, target, weight in zip(
+            neighbors.rows[entries].tolist(),
+            neighbors.cols[entries].tolist(),
+            inputs.weights[entries].tolist(),
+        )
+    ]
+    edge_scores = [inputs.scores[name][entries].tolist() for name in ASSOCIATION_MEASURES]
+
+    metadata = {
+        **stats.metadata,
+        **graph.parameters,
         "selected_nodes": len(selected_nodes),
         "selected_edges": len(edges),
     }
 
-    payload = {"metadata": metadata, "nodes": selected_nodes, "edges": edges}
-    write_json(language_core_path(), payload)
-    return payload
+    if sqlite:
+        store_graph_edges("language_core", edges)
+
+    payload = {
+        "metadata": metadata,
+        "nodes": selected_nodes,
+        "edges": (
+            {
+                "source": source,
+                "target": target,
+                "weight": weight,
+                **dict(zip(ASSOCIATION_MEASURES, values)),
+            }
+            for (source, target, weight), *values in zip(edges, *edge_scores)
+        ),
+    }
+    write_json(
+        json_output_path(language_core_path(), compress), payload, compact=compact
+    )
+    return metadata
+
+
+def sweep_graphs(
+    min_frequencies: List[int],
+    min_connections: List[int],
+    max_nodes: List[int],
+    scores: List[str],
+    window: int = 1,
+    weighted: bool = False,
+    min_score: Optional[float] = None,
+    workers: int = 1,
+    resume: bool = False,
+    refresh: bool = False,
+) -> dict:
+    # Every parameter combination from one load of the neighbour statistics;
+    # only the size and total weight of each graph are written.
+    stats = load_or_collect_neighbor_stats(
+        TARGET_TOKEN_COUNT,
+        window,
+        weighted,
+        workers=workers,
+        resume=resume,
+        refresh=refresh,
+    )
+    started = time.perf_counter()
+    inputs = GraphInputs.from_stats(stats)
+    runs = []
+    for score, min_frequency, min_connection, nodes in itertools.product(
+        scores, min_frequencies, min_connections, max_nodes
+    ):
+        graph = select_graph(
+            inputs, min_frequency, min_connection, nodes, score, min_score
+        )
+        edge_weight = inputs.weights[graph.edges].sum()
+        node_count = len(graph.nodes)
+        possible_edges = node_count * (node_count - 1) // 2
+        runs.append(
+            {
+                **graph.parameters,
+                "selected_nodes": node_count,
+                "selected_edges": len(graph.edges),
+                "density": len(graph.edges) / possible_edges if possible_edges else 0.0,
+                "edge_weight": edge_weight.item(),
+            }
+        )
+    metadata = {
+        **stats.metadata,
+        "combinations": len(runs),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    write_json(language_core_sweep_path(), {"metadata": metadata, "runs": runs})
+    return metadata
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Buduje graf co-occurrence slow na podstawie dumpu ptwiki."
     )
-    parser.add_argument("--min-frequency", type=int, default=12)
-    parser.add_argument("--min-connection", type=int, default=5)
-    parser.add_argument("--max-nodes", type=int, default=250)
+    parser.add_argument("--min-frequency", type=int, nargs="+", default=[12])
+    parser.add_argument("--min-connection", type=int, nargs="+", default=[5])
+    parser.add_argument("--max-nodes", type=int, nargs="+", default=[250])
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=1,
+        help="Maksymalna odległość (w tokenach) między sąsiadami w obrębie artykułu.",
+    )
+    parser.add_argument(
+        "--distance-weighting",
+        action="store_true",
+        help="Para w odległości d liczy się z wagą 1/d zamiast 1.",
+    )
+    parser.add_argument(
+        "--score",
+        choices=EDGE_SCORES,
+        nargs="+",
+        default=["count"],
+        help=(
+            "Miara, według której krawędzie są odcinane i sortowane (count = liczba "
+            "wystąpień z progiem --min-connection; pozostałe zastępują ten próg)."
+        ),
+    )
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=None,
+        help="Minimalna wartość miary --score dla krawędzi (domyślnie zależna od miary).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Liczba procesów zliczających sąsiedztwa (1 = tryb sekwencyjny).",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help=(
+            "Liczy rozmiary grafów dla wszystkich kombinacji podanych wartości "
+            "--min-frequency, --min-connection, --max-nodes i --score "
+            "z jednego wczytania statystyk sąsiedztwa."
+        ),
+    )
+    parser.add_argument(
+        "--refresh-stats",
+        action="store_true",
+        help="Zlicza sąsiedztwa od nowa zamiast korzystać z zapisanej pamięci podręcznej.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Wznawia zliczanie od ostatniego punktu kontrolnego, jeśli istnieje.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Zapisuje JSON bez wcięć (mniejszy plik).",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Kompresuje wynik gzipem (plik .json.gz).",
+    )
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="Zapisuje krawędzie także do bazy SQLite w data/processed.",
+    )
     args = parser.parse_args()
+    if args.window < 1:
+        parser.error("--window musi być dodatnie.")
+    if args.distance_weighting and args.window > MAX_WEIGHTED_WINDOW:
+        parser.error(
+            f"--distance-weighting działa z --window nie większym niż {MAX_WEIGHTED_WINDOW}."
+        )
+    grid = (args.min_frequency, args.min_connection, args.max_nodes, args.score)
+    if args.sweep:
+        metadata = sweep_graphs(
+            *grid,
+            window=args.window,
+            weighted=args.distance_weighting,
+            min_score=args.min_score,
+            workers=args.workers,
+            resume=args.resume,
+            refresh=args.refresh_stats,
+        )
+        print(
+            f"Language core sweep: {metadata['combinations']} combinations "
+            f"in {metadata['seconds']}s -> {language_core_sweep_path()}"
+        )
+        return
+    if any(len(values) > 1 for values in grid):
+        parser.error("Wiele wartości parametrów wymaga opcji --sweep.")
 
-    result = build_graph(args.min_frequency, args.min_connection, args.max_nodes)
-    metadata = result["metadata"]
+    metadata = build_graph(
+        args.min_frequency[0],
+        args.min_connection[0],
+        args.max_nodes[0],
+        window=args.window,
+        weighted=args.distance_weighting,
+        score=args.score[0],
+        min_score=args.min_score,
+        workers=args.workers,
+        resume=args.resume,
+        refresh=args.refresh_stats,
+        compact=args.compact,
+        compress=args.gzip,
+        sqlite=args.sqlite,
+    )
     print(
         "Language core graph: "
         f"{metadata['selected_nodes']} nodes, "
-        f"{metadata['selected_edges']} edges -> {language_core_path()}"
+        f"{metadata['selected_edges']} edges -> "
+        f"{json_output_path(language_core_path(), args.gzip)}"
     )
+    for summary in (describe_dump_reads(), describe_lemma_cache()):
+        if summary:
+            print(summary)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+_MISSING = object()
+
+
+# Lookups made by a pool worker and the entries it computed, merged into the
+# parent's cache afterwards.
+@dataclass
+class LemmaCacheDelta:
+    hits: int = 0
+    misses: int = 0
+    entries: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+
+
+# Bounded LRU memo of surface form -> lemma (None when the form is rejected).
+class LemmaCache:
+    def __init__(self, key: str, max_size: int) -> None:
+        self.key = key
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loaded_entries = 0
+        self._unsaved = 0
+        self._entries: OrderedDict[str, Optional[str]] = OrderedDict()
+        # Misses since start_recording(), None when not recording.
+        self._recorded: Optional[Dict[str, Optional[str]]] = None
+        self._recorded_from = (0, 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(
+        self, surface: str, compute: Callable[[str], Optional[str]]
+    ) -> Optional[str]:
+        entries = self._entries
+        value = entries.get(surface, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            entries.move_to_end(surface)
+            return value
+        self.misses += 1
+        self._unsaved += 1
+        value = compute(surface)
+        if self._recorded is not None:
+            self._recorded[surface] = value
+        self._insert(surface, value)
+        return value
+
+    def _insert(self, surface: str, value: Optional[str]) -> None:
+        entries = self._entries
+        entries[surface] = value
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def start_recording(self) -> None:
+        self._recorded = {}
+        self._recorded_from = (self.hits, self.misses)
+
+    def take_recorded(self) -> LemmaCacheDelta:
+        hits, misses = self._recorded_from
+        recorded = self._recorded or {}
+        self._recorded = None
+        return LemmaCacheDelta(
+            self.hits - hits, self.misses - misses, list(recorded.items())
+        )
+
+    def merge(self, delta: LemmaCacheDelta) -> None:
+        self.hits += delta.hits
+        self.misses += delta.misses
+        for surface, value in delta.entries:
+            if surface in self._entries:
+                self._entries.move_to_end(surface)
+                continue
+            self._unsaved += 1
+            self._insert(surface, value)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def dirty(self) -> bool:
+        return self._unsaved > 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "loaded_entries": self.loaded_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(
+                {"key": self.key, "entries": list(self._entries.items())},
+                handle,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+        self._unsaved = 0
+
+    @classmethod
+    def load(cls, path: Path, key: str, max_size: int) -> "LemmaCache":
+        cache = cls(key, max_size)
+        if not path.exists():
+            return cache
+        try:
+            with path.open(encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return cache
+        # A cache built for another lemmatizer or stopword list is never reused.
+        if payload.get("key") != key:
+            return cache
+        entries = payload.get("entries") or []
+        # Entries are saved least recently used first; keep the most recent ones.
+        for surface, lemma in entries[-max_size:]:
+            cache._entries[surface] = lemma
+        cache.loaded_entries = len(cache._entries)
+        return cache
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from article_store import Article
+from vocabulary import Vocabulary
+
+MAX_ORDER = 3
+KEY_DTYPE = np.uint64
+COUNT_DTYPE = np.int64
+# One packed key and one count per distinct n-gram.
+NGRAM_ENTRY_BYTES = 16
+
+
+def key_bits(order: int) -> int:
+    # Bits per lemma id in a packed key: 64 for unigrams, 32 for bigrams and
+    # 21 for trigrams (about 2 million distinct lemmas).
+    return 64 // order
+
+
+def max_target_unique(order: int) -> int:
+    # Largest lemma target a scan of this order can safely stop at. The
+    # vocabulary overshoots the target by the new lemmas of the last article,
+    # so 1/16 of the id space is kept in reserve.
+    id_limit = 1 << key_bits(order)
+    return id_limit - id_limit // 16
+
+
+def pack_ngrams(ids: np.ndarray, order: int) -> np.ndarray:
+    # Keys of all n-grams in one id sequence: id_0 << (bits * (n - 1)) | ... | id_n-1.
+    count = len(ids) - order + 1
+    if count <= 0:
+        return np.zeros(0, dtype=KEY_DTYPE)
+    ids = ids.astype(KEY_DTYPE, copy=False)
+    bits = KEY_DTYPE(key_bits(order))
+    keys = ids[:count].copy()
+    for position in range(1, order):
+        keys = (keys << bits) | ids[position : position + count]
+    return keys
+
+
+def unpack_ngrams(keys: np.ndarray, order: int) -> np.ndarray:
+    # Packed keys -> (len(keys), order) array of lemma ids.
+    bits = key_bits(order)
+    mask = KEY_DTYPE((1 << bits) - 1) if bits < 64 else ~KEY_DTYPE(0)
+    columns = [
+        (keys >> KEY_DTYPE(bits * (order - 1 - position))) & mask
+        for position in range(order)
+    ]
+    return np.stack(columns, axis=1).astype(np.int64)
+
+
+# Distinct n-gram keys in ascending order with their counts.
+@dataclass
+class NgramTable:
+    keys: np.ndarray
+    counts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def empty(cls) -> "NgramTable":
+        return cls(np.zeros(0, dtype=KEY_DTYPE), np.zeros(0, dtype=COUNT_DTYPE))
+
+    @classmethod
+    def from_keys(cls, keys: np.ndarray) -> "NgramTable":
+        unique, counts = np.unique(keys, return_counts=True)
+        return cls(unique, counts.astype(COUNT_DTYPE))
+
+    def most_common(self, limit: Optional[int] = None) -> "NgramTable":
+        # Descending count; ties keep key order, so the result is deterministic.
+        order = np.argsort(-self.counts, kind="stable")[:limit]
+        return NgramTable(self.keys[order], self.counts[order])
+
+
+def merge_tables(tables: List[NgramTable], min_count: int = 1) -> NgramTable:
+    tables = [table for table in tables if len(table)]
+    if not tables:
+        return NgramTable.empty()
+    keys = np.concatenate([table.keys for table in tables])
+    counts = np.concatenate([table.counts for table in tables])
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    counts = counts[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    merged = NgramTable(keys[starts], np.add.reduceat(counts, starts))
+    if min_count > 1:
+        keep = merged.counts >= min_count
+        merged = NgramTable(merged.keys[keep], merged.counts[keep])
+    return merged
+
+
+# Counts all n-grams up to `order` over whole articles until the lemma
+# vocabulary reaches target_unique (0 = no limit). Each chunk of articles
+# becomes one sorted run; runs are merged once they hold more than max_keys
+# entries (and at least twice the last merged table, so a table that stays
+# large is not re-sorted for every chunk). If the merged table is still too
+# large, n-grams below min_count are dropped from it, with the threshold
+# doubled until the table fits. A prune at threshold t can undercount an
+# n-gram by at most t - 1; the sum is reported as the error bound.
+@dataclass
+class NgramCounter:
+    order: int
+    target_unique: int
+    min_count: int = 1
+    max_keys: int = 1 << 24
+    vocabulary: Vocabulary = field(default_factory=Vocabulary)
+    runs: Dict[int, List[NgramTable]] = field(default_factory=dict)
+    # Keys of the table left by the last merge, and keys added since.
+    merged_keys: Dict[int, int] = field(default_factory=dict)
+    pending_keys: Dict[int, int] = field(default_factory=dict)
+    totals: Dict[int, int] = field(default_factory=dict)
+    prunes: Dict[int, int] = field(default_factory=dict)
+    undercounts: Dict[int, int] = field(default_factory=dict)
+    articles_used: int = 0
+    files_considered: int = 0
+    total_tokens: int = 0
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.order <= MAX_ORDER:
+            raise ValueError(f"Obsługiwane są n-gramy rzędu 1-{MAX_ORDER}.")
+        for n in self.orders:
+            self.runs.setdefault(n, [])
+            self.merged_keys.setdefault(n, 0)
+            self.pending_keys.setdefault(n, 0)
+            self.totals.setdefault(n, 0)
+            self.prunes.setdefault(n, 0)
+            self.undercounts.setdefault(n, 0)
+
+    @property
+    def orders(self) -> range:
+        return range(1, self.order + 1)
+
+    def add_articles(self, articles: List[Article]) -> bool:
+        keys: Dict[int, List[np.ndarray]] = {n: [] for n in self.orders}
+        reached_target = False
+        id_limit = 1 << key_bits(self.order)
+        for article in articles:
+            self.files_considered = article.file_index + 1
+            if not article.tokens:
+                continue
+            self.articles_used += 1
+            self.total_tokens += len(article.tokens)
+            ids = np.frombuffer(self.vocabulary.encode(article.tokens), dtype=np.uint32)
+            if len(self.vocabulary) > id_limit:
+                raise ValueError(
+                    f"Słownik przekracza {id_limit} lematów; nie mieści się w kluczach "
+                    f"{self.order}-gramów."
+                )
+            for n in self.orders:
+                keys[n].append(pack_ngrams(ids, n))
+            if self.target_unique and len(self.vocabulary) >= self.target_unique:
+                reached_target = True
+                break
+        for n, parts in keys.items():
+            if parts:
+                self._add_run(n, NgramTable.from_keys(np.concatenate(parts)))
+        return reached_target
+
+    def _add_run(self, n: int, run: NgramTable) -> None:
+        if not len(run):
+            return
+        self.totals[n] += int(run.counts.sum())
+        self.runs[n].append(run)
+        self.pending_keys[n] += len(run)
+        held = self.merged_keys[n] + self.pending_keys[n]
+        if held <= max(self.max_keys, 2 * self.merged_keys[n]):
+            return
+        merged = merge_tables(self.runs[n])
+        if len(merged) > self.max_keys and self.min_count > 1:
+            merged = self._prune(n, merged)
+        self.runs[n] = [merged]
+        self.merged_keys[n] = len(merged)
+        self.pending_keys[n] = 0
+
+    def _prune(self, n: int, table: NgramTable) -> NgramTable:
+        threshold = self.min_count
+        keep = table.counts >= threshold
+        while np.count_nonzero(keep) > self.max_keys:
+            threshold *= 2
+            keep = table.counts >= threshold
+        self.prunes[n] += 1
+        self.undercounts[n] += threshold - 1
+        return NgramTable(table.keys[keep], table.counts[keep])
+
+    def tables(self) -> Dict[int, NgramTable]:
+        # min_count only drives the prunes; the final tables keep every n-gram
+        # still held, including those seen once.
+        return {n: merge_tables(self.runs[n]) for n in self.orders}
+
+    def max_undercount(self, n: int) -> int:
+        return self.undercounts[n]
+
+    def decode(self, keys: np.ndarray, n: int) -> List[str]:
+        words = self.vocabulary.words
+        return [" ".join(words[i] for i in row) for row in unpack_ngrams(keys, n).tolist()]
+
+    def metadata(self, reached_target: bool, dump_files: int) -> dict:
+        return {
+            "order": self.order,
+            "target_unique_words": self.target_unique,
+            "unique_words_observed": len(self.vocabulary),
+            "total_tokens_observed": self.total_tokens,
+            "articles_used": self.articles_used,
+            "files_considered": self.files_considered if reached_target else dump_files,
+            "min_count": self.min_count,
+            "max_keys": self.max_keys,
+        }
+
+
+def memory_to_keys(memory_limit_mb: float) -> int:
+    return max(1, int(memory_limit_mb * 1024 * 1024 / NGRAM_ENTRY_BYTES))
+
+
+def ngram_rows(
+    counter: NgramCounter, n: int, table: NgramTable, limit: int
+) -> Tuple[List[dict], np.ndarray]:
+    # Top `limit` rows with at least min_count occurrences, plus all counts in
+    # descending order (for the Zipf curve).
+    ranked = table.most_common()
+    total = counter.totals[n]
+    frequent = int(np.count_nonzero(ranked.counts >= counter.min_count))
+    limit = min(limit, frequent)
+    top = NgramTable(ranked.keys[:limit], ranked.counts[:limit])
+    rows = [
+        {
+            "rank": rank,
+            "ngram": ngram,
+            "count": count,
+            "relative_frequency": count / total if total else 0.0,
+        }
+        for rank, (ngram, count) in enumerate(
+            zip(counter.decode(top.keys, n), top.counts.tolist()), start=1
+        )
+    ]
+    return rows, ranked.counts
@@ -0,0 +1,163 @@
+import argparse
+from contextlib import closing
+from typing import Dict, Tuple
+
+import numpy as np
+
+from common import (
+    NDJSON_FILES,
+    TARGET_TOKEN_COUNT,
+    describe_dump_reads,
+    describe_lemma_cache,
+    iter_article_chunks,
+    json_output_path,
+    ngrams_path,
+    save_lemma_cache,
+    write_json,
+)
+from ngram_counts import (
+    MAX_ORDER,
+    NgramCounter,
+    NgramTable,
+    key_bits,
+    max_target_unique,
+    memory_to_keys,
+    ngram_rows,
+)
+from zipf_fit import log_binned_ranks, ols_fit
+
+
+def count_ngrams(
+    order: int,
+    target_unique: int,
+    min_count: int,
+    max_keys: int,
+    workers: int = 1,
+) -> Tuple[NgramCounter, Dict[int, NgramTable], dict]:
+    counter = NgramCounter(order, target_unique, min_count=min_count, max_keys=max_keys)
+    reached_target = False
+    with closing(iter_article_chunks(workers)) as chunks:
+        for chunk in chunks:
+            if counter.add_articles(chunk.articles):
+                reached_target = True
+                break
+    save_lemma_cache()
+    return counter, counter.tables(), counter.metadata(reached_target, len(NDJSON_FILES))
+
+
+def zipf_curve(counts: np.ndarray, bins: int) -> dict:
+    # Rank-frequency curve of one n-gram order on log-binned ranks.
+    if len(counts) < 2:
+        return {"slope": 0.0, "intercept": 0.0, "r_squared": 0.0, "points": []}
+    ranks = np.log(np.arange(1, len(counts) + 1, dtype=np.float64))
+    fit = ols_fit(ranks, np.log(counts.astype(np.float64)))
+    rank_bins = log_binned_ranks(counts, bins)
+    points = [
+        {
+            "rank": start,
+            "rank_end": end,
+            "frequency": frequency,
+            "log_rank": log_rank,
+            "log_frequency": log_frequency,
+        }
+        for start, end, frequency, log_rank, log_frequency in zip(
+            rank_bins.starts.tolist(),
+            rank_bins.ends.tolist(),
+            rank_bins.mean_frequency.tolist(),
+            rank_bins.log_rank.tolist(),
+            rank_bins.log_frequency.tolist(),
+        )
+    ]
+    return {
+        "slope": fit.slope,
+        "intercept": fit.intercept,
+        "r_squared": fit.r_squared,
+        "points": points,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Zlicza n-gramy lematów (do trigramów) i buduje ich krzywe Zipfa."
+    )
+    parser.add_argument("--order", type=int, default=MAX_ORDER, choices=range(1, MAX_ORDER + 1))
+    parser.add_argument(
+        "--target-tokens",
+        type=int,
+        default=TARGET_TOKEN_COUNT,
+        help="Liczba unikalnych lematów, po której kończy się zliczanie (0 = cały dump).",
+    )
+    parser.add_argument("--top-k", type=int, default=1000)
+    parser.add_argument(
+        "--min-count",
+        type=int,
+        default=2,
+        help=(
+            "Próg przycinania scalanych tablic i minimalna liczba wystąpień n-gramu "
+            "w wierszach top-K (krzywa Zipfa obejmuje wszystkie n-gramy)."
+        ),
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        default=1024.0,
+        help="Limit pamięci tablic jednego rzędu n-gramów przed przycinaniem (MB).",
+    )
+    parser.add_argument("--bins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Zapisuje JSON bez wcięć (mniejszy plik).",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Kompresuje wynik gzipem (plik .json.gz).",
+    )
+    args = parser.parse_args()
+    # Packed trigram keys hold about 2 million lemma ids, so a trigram scan
+    # needs a target below that instead of failing hours into the dump.
+    limit = max_target_unique(args.order)
+    needs_target = key_bits(args.order) < 32
+    if args.target_tokens > limit or (needs_target and args.target_tokens <= 0):
+        parser.error(f"Dla --order {args.order} --target-tokens musi być z zakresu 1-{limit}.")
+
+    counter, tables, metadata = count_ngrams(
+        args.order,
+        args.target_tokens,
+        args.min_count,
+        memory_to_keys(args.memory_limit),
+        workers=args.workers,
+    )
+    orders = {}
+    for n, table in tables.items():
+        rows, ranked_counts = ngram_rows(counter, n, table, args.top_k)
+        orders[str(n)] = {
+            "metadata": {
+                "n": n,
+                "total_ngrams": counter.totals[n],
+                "distinct_ngrams": len(table),
+                "prunes": counter.prunes[n],
+                "max_undercount": counter.max_undercount(n),
+            },
+            "top": rows,
+            "zipf": zipf_curve(ranked_counts, args.bins),
+        }
+    output_path = json_output_path(ngrams_path(), args.gzip)
+    write_json(output_path, {"metadata": metadata, "orders": orders}, compact=args.compact)
+
+    for n, payload in orders.items():
+        summary = payload["metadata"]
+        print(
+            f"{n}-gramy: {summary['distinct_ngrams']} różnych z {summary['total_ngrams']}, "
+            f"nachylenie Zipfa={payload['zipf']['slope']:.3f}"
+        )
+    print(f"N-gramy -> {output_path}")
+    for summary in (describe_dump_reads(), describe_lemma_cache()):
+        if summary:
+            print(summary)
+
+
+if __name__ == "__main__":
+    main()
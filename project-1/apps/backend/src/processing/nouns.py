@@ -8,6 +8,7 @@ from common import (
     MANUAL_ALLOW,
     MANUAL_BLOCK,
     STOPWORDS,
+    close_frequency,
     load_or_build_frequency,
     nouns_path,
     write_json,
@@ -121,6 +122,7 @@ def main() -> None:
             )
         if len(nouns) >= args.limit:
             break
+    close_frequency(frequency_payload)
 
     payload = {
         "metadata": {
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+PROCESSED_DB_VERSION = 1
+FREQUENCY_COLUMNS = ("rank", "word", "count", "relative_frequency", "count_lower_bound")
+_FREQUENCY_SELECT = f"SELECT {', '.join(FREQUENCY_COLUMNS)} FROM frequency"
+_FREQUENCY_INSERT = (
+    f"INSERT INTO frequency ({', '.join(FREQUENCY_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in FREQUENCY_COLUMNS)})"
+)
+_INSERT_BATCH = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    name TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS frequency (
+    rank INTEGER PRIMARY KEY,
+    word TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    relative_frequency REAL NOT NULL,
+    count_lower_bound INTEGER
+);
+CREATE INDEX IF NOT EXISTS frequency_word ON frequency (word);
+CREATE TABLE IF NOT EXISTS edges (
+    graph TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    weight NUMERIC NOT NULL
+);
+CREATE INDEX IF NOT EXISTS edges_source ON edges (graph, source);
+CREATE INDEX IF NOT EXISTS edges_target ON edges (graph, target);
+"""
+
+
+def _row_dict(row: tuple) -> dict:
+    entry = dict(zip(FREQUENCY_COLUMNS, row))
+    # Only the approximate table has lower bounds; keep rows shaped like the JSON.
+    if entry["count_lower_bound"] is None:
+        del entry["count_lower_bound"]
+    return entry
+
+
+def _prefix_end(prefix: str) -> str:
+    # Smallest string greater than every string starting with prefix.
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# Processed outputs in one SQLite file. The frequency table is keyed by rank
+# and indexed by word, so rank ranges, prefixes and single words are B-tree
+# lookups instead of a full JSON load.
+class ProcessedDb:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        version = self.read_metadata("version")
+        if version != PROCESSED_DB_VERSION:
+            with self.connection:
+                self.connection.execute("DELETE FROM metadata")
+                self.connection.execute("DELETE FROM frequency")
+                self.connection.execute("DELETE FROM edges")
+            self.write_metadata("version", PROCESSED_DB_VERSION)
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["ProcessedDb"]:
+        return cls(path) if path.exists() else None
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ProcessedDb":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def read_metadata(self, name: str) -> Optional[Union[dict, int]]:
+        row = self.connection.execute(
+            "SELECT payload FROM metadata WHERE name = ?", (name,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write_metadata(self, name: str, payload: Union[dict, int]) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO metadata (name, payload) VALUES (?, ?)",
+                (name, json.dumps(payload, ensure_ascii=False)),
+            )
+
+    def clear_frequency(self) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM frequency")
+            self.connection.execute("DELETE FROM metadata WHERE name = 'frequency'")
+
+    def store_frequency(self, metadata: dict, rows: Iterable[dict]) -> Iterator[dict]:
+        # Inserts rows while passing them through, so the table can be written
+        # to JSON and SQLite in one streaming pass. Nothing is committed unless
+        # the rows are consumed to the end.
+        connection = self.connection
+        with connection:
+            connection.execute("DELETE FROM frequency")
+            connection.execute("DELETE FROM metadata WHERE name = 'frequency'")
+            batch: List[tuple] = []
+            for row in rows:
+                batch.append(tuple(row.get(column) for column in FREQUENCY_COLUMNS))
+                if len(batch) >= _INSERT_BATCH:
+                    connection.executemany(_FREQUENCY_INSERT, batch)
+                    batch = []
+                yield row
+            if batch:
+                connection.executemany(_FREQUENCY_INSERT, batch)
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata (name, payload) VALUES ('frequency', ?)",
+                (json.dumps(metadata, ensure_ascii=False),),
+            )
+
+    def frequency_view(self) -> Optional["FrequencyView"]:
+        metadata = self.read_metadata("frequency")
+        if metadata is None:
+            return None
+        return FrequencyView(self.connection, metadata)
+
+    def write_edges(self, graph: str, edges: Iterable[Tuple[str, str, float]]) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM edges WHERE graph = ?", (graph,))
+            self.connection.executemany(
+                "INSERT INTO edges (graph, source, target, weight) VALUES (?, ?, ?, ?)",
+                ((graph, source, target, weight) for source, target, weight in edges),
+            )
+
+    def edges(self, graph: str, word: str) -> List[Tuple[str, str, float]]:
+        return self.connection.execute(
+            "SELECT source, target, weight FROM edges WHERE graph = ? AND source = ? "
+            "UNION ALL "
+            "SELECT source, target, weight FROM edges WHERE graph = ? AND target = ? "
+            "AND source != target",
+            (graph, word, graph, word),
+        ).fetchall()
+
+
+# Read-only sequence over the stored frequency table. Rows are the same dicts
+# as in frequency_table.json; indexing is by position (rank - 1). Closing the
+# view closes the connection it reads from.
+class FrequencyView:
+    def __init__(self, connection: sqlite3.Connection, metadata: dict) -> None:
+        self.connection = connection
+        self.metadata = metadata
+        self._length: Optional[int] = None
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "FrequencyView":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        if self._length is None:
+            row = self.connection.execute("SELECT MAX(rank) FROM frequency").fetchone()
+            self._length = row[0] or 0
+        return self._length
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.rank_range(1, len(self))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[dict, List[dict]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            rows = list(self.rank_range(start + 1, stop)) if stop > start else []
+            return rows[::step] if step != 1 else rows
+        if index < 0:
+            index += len(self)
+        row = self.connection.execute(
+            f"{_FREQUENCY_SELECT} WHERE rank = ?", (index + 1,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return _row_dict(row)
+
+    def rank_range(self, first: int, last: int) -> Iterator[dict]:
+        # Ranks first..last inclusive, read with a cursor rather than all at once.
+        with closing(
+            self.connection.execute(
+                f"{_FREQUENCY_SELECT} WHERE rank BETWEEN ? AND ? ORDER BY rank",
+                (first, last),
+            )
+        ) as cursor:
+            for row in cursor:
+                yield _row_dict(row)
+
+    def lookup(self, word: str) -> Optional[dict]:
+        row = self.connection.execute(
+            f"{_FREQUENCY_SELECT} WHERE word = ? ORDER BY rank LIMIT 1", (word,)
+        ).fetchone()
+        return _row_dict(row) if row else None
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> List[dict]:
+        # Range scan on the word index; results ordered by rank.
+        if not prefix:
+            return self[:limit] if limit is not None else list(self)
+        query = f"{_FREQUENCY_SELECT} WHERE word >= ? AND word < ? ORDER BY rank"
+        parameters: tuple = (prefix, _prefix_end(prefix))
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters += (limit,)
+        return [_row_dict(row) for row in self.connection.execute(query, parameters)]
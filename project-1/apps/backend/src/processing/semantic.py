@@ -1,13 +1,21 @@
 import argparse
-import json
 from collections import Counter
+from contextlib import closing
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import stanza
 
-from common import NDJSON_FILES, TARGET_TOKEN_COUNT, html_to_text, semantic_path, write_json
+from common import (
+    TARGET_TOKEN_COUNT,
+    describe_dump_reads,
+    iter_articles,
+    json_output_path,
+    semantic_path,
+    store_graph_edges,
+    write_json,
+)
 
 POS_ADJ = "ADJ"
 POS_NOUN = "NOUN"
@@ -80,31 +88,18 @@ class TaggedToken:
 def iter_tagged_tokens(target_tokens: int) -> Iterator[TaggedToken]:
     pipeline = _pipeline()
     total_tokens = 0
-    for ndjson_file in NDJSON_FILES:
-        with ndjson_file.open(encoding="utf-8") as handle:
-            for line in handle:
-                if not line.strip():
-                    continue
-                try:
-                    payload = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                html = payload.get("article_body", {}).get("html")
-                if not html:
-                    continue
-                text = html_to_text(html)
-                if not text:
-                    continue
-                doc = pipeline(text)
-                for sentence in doc.sentences:
-                    for word in sentence.words:
-                        lemma = _normalize_lemma(word.lemma)
-                        if not lemma or not word.upos:
-                            continue
-                        yield TaggedToken(lemma=lemma, pos=word.upos)
-                        total_tokens += 1
-                        if total_tokens >= target_tokens:
-                            return
+    with closing(iter_articles(tokenize_text=False)) as articles:
+        for article in articles:
+            doc = pipeline(article.text)
+            for sentence in doc.sentences:
+                for word in sentence.words:
+                    lemma = _normalize_lemma(word.lemma)
+                    if not lemma or not word.upos:
+                        continue
+                    yield TaggedToken(lemma=lemma, pos=word.upos)
+                    total_tokens += 1
+                    if total_tokens >= target_tokens:
+                        return
 
 
 def select_top(counter: Counter[str], limit: int) -> List[Tuple[str, int]]:
@@ -159,10 +154,18 @@ def collect_bipartite(target_tokens: int) -> dict:
     }
 
 
+def _edge_items(edges: List[Tuple[str, str, int]]) -> Iterator[dict]:
+    for source, target, weight in edges:
+        yield {"source": source, "target": target, "weight": weight}
+
+
 def build_graphs(
     top_n: int,
     min_connection: int,
     target_tokens: int = TARGET_TOKEN_COUNT,
+    compact: bool = False,
+    compress: bool = False,
+    sqlite: bool = False,
 ) -> dict:
     stats = collect_bipartite(target_tokens)
 
@@ -175,22 +178,26 @@ def build_graphs(
     verb_set = {word for word, _ in top_verbs}
 
     adj_edges = [
-        {"source": adj, "target": noun, "weight": weight}
+        (adj, noun, weight)
         for (adj, noun), weight in stats["adj_noun_edges"].items()
         if adj in adj_set and noun in noun_set and weight >= min_connection
     ]
     verb_edges = [
-        {"source": verb, "target": noun, "weight": weight}
+        (verb, noun, weight)
         for (verb, noun), weight in stats["verb_noun_edges"].items()
         if verb in verb_set and noun in noun_set and weight >= min_connection
     ]
 
+    metadata = {
+        **stats["metadata"],
+        "top_n": top_n,
+        "min_connection": min_connection,
+    }
+    if sqlite:
+        store_graph_edges("adjective_noun", adj_edges)
+        store_graph_edges("verb_noun", verb_edges)
     payload = {
-        "metadata": {
-            **stats["metadata"],
-            "top_n": top_n,
-            "min_connection": min_connection,
-        },
+        "metadata": metadata,
         "adjective_noun": {
             "metadata": {
                 "left_label": "przymiotniki",
@@ -205,7 +212,7 @@ def build_graphs(
             "right_nodes": [
                 {"id": word, "frequency": count} for word, count in top_nouns
             ],
-            "edges": adj_edges,
+            "edges": _edge_items(adj_edges),
         },
         "verb_noun": {
             "metadata": {
@@ -221,11 +228,11 @@ def build_graphs(
             "right_nodes": [
                 {"id": word, "frequency": count} for word, count in top_nouns
             ],
-            "edges": verb_edges,
+            "edges": _edge_items(verb_edges),
         },
     }
-    write_json(semantic_path(), payload)
-    return payload
+    write_json(json_output_path(semantic_path(), compress), payload, compact=compact)
+    return metadata
 
 
 def main() -> None:
@@ -235,15 +242,40 @@ def main() -> None:
     parser.add_argument("--top-n", type=int, default=100)
     parser.add_argument("--min-connection", type=int, default=1)
     parser.add_argument("--target-tokens", type=int, default=TARGET_TOKEN_COUNT)
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Zapisuje JSON bez wcięć (mniejszy plik).",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Kompresuje wynik gzipem (plik .json.gz).",
+    )
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="Zapisuje krawędzie także do bazy SQLite w data/processed.",
+    )
     args = parser.parse_args()
 
-    payload = build_graphs(args.top_n, args.min_connection, args.target_tokens)
-    meta = payload["metadata"]
+    meta = build_graphs(
+        args.top_n,
+        args.min_connection,
+        args.target_tokens,
+        compact=args.compact,
+        compress=args.gzip,
+        sqlite=args.sqlite,
+    )
     print(
         "Semantic graphs: "
         f"top_n={meta['top_n']}, "
-        f"min_connection={meta['min_connection']} -> {semantic_path()}"
+        f"min_connection={meta['min_connection']} -> "
+        f"{json_output_path(semantic_path(), args.gzip)}"
     )
+    summary = describe_dump_reads()
+    if summary:
+        print(summary)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, List
+
+from json_stream import write_json_file
+
+SHARD_ROWS = 5000
+SHARDS_MANIFEST_FILENAME = "manifest.json"
+SHARD_PATTERN = "shard-*.json"
+SHARDS_VERSION = 1
+
+
+def shard_filename(number: int) -> str:
+    return f"shard-{number:05d}.json"
+
+
+def _write_shard(path: Path, rows: List[dict]) -> dict:
+    data = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return {
+        "file": path.name,
+        "first_rank": rows[0]["rank"],
+        "last_rank": rows[-1]["rank"],
+        "rows": len(rows),
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+# Splits a rank-ordered table into fixed-size compact JSON shards plus a
+# manifest with the row range and content hash of every shard, so a client can
+# fetch only the shards behind the page it shows.
+def write_table_shards(
+    directory: Path,
+    metadata: dict,
+    rows: Iterable[dict],
+    rows_per_shard: int = SHARD_ROWS,
+) -> dict:
+    directory.mkdir(parents=True, exist_ok=True)
+    shards: List[dict] = []
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, rows_per_shard))
+        if not batch:
+            break
+        shards.append(_write_shard(directory / shard_filename(len(shards)), batch))
+    manifest = {
+        "version": SHARDS_VERSION,
+        "metadata": metadata,
+        "rows_per_shard": rows_per_shard,
+        "total_rows": sum(shard["rows"] for shard in shards),
+        "shards": shards,
+    }
+    # The manifest goes last; shards from an earlier, longer table are removed
+    # once nothing refers to them.
+    write_json_file(directory / SHARDS_MANIFEST_FILENAME, manifest)
+    current = {shard["file"] for shard in shards}
+    for path in directory.glob(SHARD_PATTERN):
+        if path.name not in current:
+            path.unlink()
+    return manifest
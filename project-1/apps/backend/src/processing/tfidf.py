@@ -0,0 +1,128 @@
+import argparse
+from typing import Iterator, List
+
+import numpy as np
+
+from common import json_output_path, load_or_build_corpus, tfidf_path, write_json
+from corpus_store import CorpusResult, DocumentTerms
+
+
+def inverse_document_frequency(document_counts: np.ndarray, documents: int) -> np.ndarray:
+    # Smoothed idf, as if one extra article contained every word once.
+    return np.log((1.0 + documents) / (1.0 + document_counts)) + 1.0
+
+
+def keyness_rows(
+    corpus: CorpusResult, idf: np.ndarray, limit: int
+) -> List[dict]:
+    # Corpus-level keyness: total count weighted by idf, so frequent words that
+    # appear in every article rank below words concentrated in a few.
+    documents = corpus.documents
+    counts = np.asarray(corpus.counts, dtype=np.float64)
+    scores = counts * idf
+    order = np.argsort(-scores, kind="stable")[:limit]
+    words = corpus.vocabulary.words
+    article_count = len(documents)
+    # Share of the articles containing each word; 0 for an empty store.
+    dispersion = np.array(documents.document_counts, dtype=np.float64)
+    if article_count:
+        dispersion /= article_count
+    return [
+        {
+            "rank": rank,
+            "word": words[index],
+            "count": int(corpus.counts[index]),
+            "document_frequency": int(documents.document_counts[index]),
+            "dispersion": float(dispersion[index]),
+            "idf": float(idf[index]),
+            "tfidf": float(scores[index]),
+        }
+        for rank, index in enumerate(order.tolist(), start=1)
+    ]
+
+
+def document_rows(
+    documents: DocumentTerms, words: List[str], idf: np.ndarray, limit: int
+) -> Iterator[dict]:
+    offsets = np.asarray(documents.offsets)
+    term_ids = np.asarray(documents.term_ids)
+    term_counts = np.asarray(documents.term_counts)
+    for number, (position, start, end) in enumerate(
+        zip(documents.positions.tolist(), offsets[:-1].tolist(), offsets[1:].tolist())
+    ):
+        ids = term_ids[start:end]
+        counts = term_counts[start:end]
+        length = int(counts.sum())
+        weights = counts / length * idf[ids]
+        order = np.argsort(-weights, kind="stable")[:limit]
+        yield {
+            "article": number,
+            "position": position,
+            "tokens": length,
+            "terms": [
+                {
+                    "word": words[ids[index]],
+                    "count": int(counts[index]),
+                    "tfidf": float(weights[index]),
+                }
+                for index in order.tolist()
+            ],
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tabele TF-IDF i słowa kluczowe artykułów na podstawie korpusu."
+    )
+    parser.add_argument("--top-k", type=int, default=1000)
+    parser.add_argument(
+        "--terms-per-article",
+        type=int,
+        default=10,
+        help="Liczba najważniejszych słów zapisywanych dla każdego artykułu.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Zapisuje JSON bez wcięć (mniejszy plik).",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Kompresuje wynik gzipem (plik .json.gz).",
+    )
+    args = parser.parse_args()
+
+    corpus = load_or_build_corpus()
+    if corpus.documents is None or corpus.counts is None:
+        # Stores written before per-article statistics were recorded.
+        corpus = load_or_build_corpus(force_rebuild=True)
+    documents = corpus.documents
+    idf = inverse_document_frequency(
+        np.asarray(documents.document_counts, dtype=np.float64), len(documents)
+    )
+    metadata = {
+        "articles": len(documents),
+        "unique_words": len(corpus.vocabulary),
+        "total_tokens": corpus.total_count,
+        "idf": "ln((1 + N) / (1 + df)) + 1",
+        "top_k": args.top_k,
+        "terms_per_article": args.terms_per_article,
+    }
+    payload = {
+        "metadata": metadata,
+        "keyness": keyness_rows(corpus, idf, args.top_k),
+        "articles": document_rows(
+            documents, corpus.vocabulary.words, idf, args.terms_per_article
+        ),
+    }
+    output_path = json_output_path(tfidf_path(), args.gzip)
+    write_json(output_path, payload, compact=args.compact)
+    print(
+        f"TF-IDF: {metadata['articles']} artykułów, "
+        f"{metadata['unique_words']} słów -> {output_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
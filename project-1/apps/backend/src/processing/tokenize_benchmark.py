@@ -0,0 +1,97 @@
+import argparse
+import time
+from itertools import islice
+from typing import Callable, List
+
+from common import (
+    ARTICLE_CHUNK_SIZE,
+    LEMMA_CACHE_SIZE,
+    TOKENIZER_FINGERPRINT,
+    WORD_RE,
+    html_to_text,
+    iter_article_html,
+    tokenize,
+    tokenize_batch,
+)
+from lemma_cache import LemmaCache
+
+
+def _empty_cache() -> LemmaCache:
+    return LemmaCache(TOKENIZER_FINGERPRINT, LEMMA_CACHE_SIZE)
+
+
+def _per_article(texts: List[str], cache: LemmaCache, batch_size: int) -> List[List[str]]:
+    return [tokenize(text, cache) for text in texts]
+
+
+def _batched(texts: List[str], cache: LemmaCache, batch_size: int) -> List[List[str]]:
+    tokens: List[List[str]] = []
+    for start in range(0, len(texts), batch_size):
+        tokens.extend(tokenize_batch(texts[start:start + batch_size], cache))
+    return tokens
+
+
+def _time_tokenizer(
+    tokenizer: Callable[[List[str], LemmaCache, int], List[List[str]]],
+    texts: List[str],
+    batch_size: int,
+    repeat: int,
+    cold: bool,
+) -> float:
+    best = float("inf")
+    cache = _empty_cache()
+    if not cold:
+        tokenizer(texts, cache, batch_size)
+    for _ in range(repeat):
+        if cold:
+            cache = _empty_cache()
+        started = time.perf_counter()
+        tokenizer(texts, cache, batch_size)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Porównuje tokenize() z tokenize_batch() na artykułach z dumpu ptwiki "
+            "i mierzy przyspieszenie."
+        )
+    )
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=ARTICLE_CHUNK_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Mierzy z rozgrzanym cache lematów zamiast pustego.",
+    )
+    args = parser.parse_args()
+
+    texts = [html_to_text(html) for html in islice(iter_article_html(), args.articles)]
+    if not texts:
+        raise SystemExit("Brak artykułów w dumpie.")
+
+    expected = _per_article(texts, _empty_cache(), args.batch_size)
+    actual = _batched(texts, _empty_cache(), args.batch_size)
+    mismatches = sum(1 for left, right in zip(expected, actual) if left != right)
+
+    occurrences = sum(len(WORD_RE.findall(text)) for text in texts)
+    distinct = len({match for text in texts for match in WORD_RE.findall(text)})
+    cold = not args.warm
+    single_time = _time_tokenizer(_per_article, texts, args.batch_size, args.repeat, cold)
+    batch_time = _time_tokenizer(_batched, texts, args.batch_size, args.repeat, cold)
+
+    print(
+        f"Artykuły: {len(texts)}, wystąpienia: {occurrences}, "
+        f"różne formy: {distinct}, rozbieżności: {mismatches}"
+    )
+    print(f"tokenize:       {single_time:.3f} s ({occurrences / single_time:,.0f} tokenów/s)")
+    print(f"tokenize_batch: {batch_time:.3f} s ({occurrences / batch_time:,.0f} tokenów/s)")
+    print(f"Przyspieszenie: {single_time / batch_time:.2f}x (partia {args.batch_size})")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+# Dense integer ids for lemmas, assigned in first-seen order.
+class Vocabulary:
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._ids: Dict[str, int] = {}
+        self._words: List[str] = []
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._ids
+
+    @property
+    def words(self) -> List[str]:
+        return self._words
+
+    def add(self, word: str) -> int:
+        token_id = self._ids.get(word)
+        if token_id is None:
+            token_id = len(self._words)
+            self._ids[word] = token_id
+            self._words.append(word)
+        return token_id
+
+    def id(self, word: str) -> int:
+        return self._ids[word]
+
+    def get(self, word: str, default: int = -1) -> int:
+        return self._ids.get(word, default)
+
+    def word(self, token_id: int) -> str:
+        return self._words[token_id]
+
+    def copy(self) -> "Vocabulary":
+        vocabulary = Vocabulary()
+        vocabulary._words = list(self._words)
+        vocabulary._ids = dict(self._ids)
+        return vocabulary
+
+    def encode(self, tokens: Iterable[str]) -> array:
+        add = self.add
+        return array("I", [add(token) for token in tokens])
+
+    def decode(self, token_ids: Iterable[int]) -> List[str]:
+        words = self._words
+        return [words[token_id] for token_id in token_ids]
+
+    def save(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8", newline="\n") as handle:
+            for word in self._words:
+                handle.write(word)
+                handle.write("\n")
+
+    @classmethod
+    def load(cls, path: Path, limit: int | None = None) -> "Vocabulary":
+        with path.open(encoding="utf-8", newline="\n") as handle:
+            words = handle.read().split("\n")
+        # The file ends with a newline, so the last element is always empty.
+        words.pop()
+        if limit is not None:
+            del words[limit:]
+        vocabulary = cls()
+        vocabulary._words = words
+        vocabulary._ids = {word: token_id for token_id, word in enumerate(words)}
+        return vocabulary
@@ -1,77 +1,272 @@
 import argparse
 import math
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-from common import load_or_build_frequency, write_json, zipf_path
+import numpy as np
 
+from common import (
+    TARGET_TOKEN_COUNT,
+    close_frequency,
+    frequency_path,
+    heaps_path,
+    load_corpus,
+    load_or_build_corpora,
+    load_or_build_frequency,
+    open_frequency_view,
+    write_json,
+    zipf_path,
+)
+from json_stream import existing_json
+from zipf_fit import (
+    HeapsFit,
+    bootstrap,
+    fit_heaps,
+    fit_power_law,
+    log_binned_ranks,
+    log_rank_frequency,
+    ols_fit,
+    percentile_interval,
+)
 
-def linear_regression(points: List[Tuple[float, float]]) -> Tuple[float, float, float]:
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
-    n = len(points)
-    sum_x = sum(xs)
-    sum_y = sum(ys)
-    sum_xy = sum(x * y for x, y in points)
-    sum_xx = sum(x * x for x in xs)
-    denominator = n * sum_xx - sum_x * sum_x
-    slope = (n * sum_xy - sum_x * sum_y) / denominator if denominator else 0.0
-    intercept = (sum_y - slope * sum_x) / n if n else 0.0
-    mean_y = sum_y / n if n else 0.0
-    ss_tot = sum((y - mean_y) ** 2 for y in ys)
-    ss_res = sum((y - (slope * x + intercept)) ** 2 for x, y in points)
-    r_squared = 1 - ss_res / ss_tot if ss_tot else 0.0
-    return slope, intercept, r_squared
 
+def _reciprocal_interval(
+    interval: Tuple[float, float]
+) -> Optional[Tuple[float, float]]:
+    # alpha CI -> Zipf exponent CI; s = 1 / (alpha - 1) is decreasing in alpha.
+    # Unbounded (None) once the interval reaches alpha <= 1.
+    low, high = interval
+    if low <= 1.0:
+        return None
+    return 1.0 / (high - 1.0), 1.0 / (low - 1.0)
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Analiza prawa Zipfa dla korpusu.")
-    parser.add_argument(
-        "--max-points",
-        type=int,
-        default=2000,
-        help="Maksymalna liczba punktów (rang) wykorzystanych w regresji.",
-    )
-    args = parser.parse_args()
 
-    frequency_payload = load_or_build_frequency()
+def _binned_points(table: List[dict], frequencies: np.ndarray, bins: int) -> List[dict]:
+    # One point per log-spaced rank range, labelled with its first word; the
+    # frequency is the bin mean and log_frequency the mean log frequency.
+    rank_bins = log_binned_ranks(frequencies, bins)
+    return [
+        {
+            "rank": start,
+            "rank_end": end,
+            "bin_size": end - start + 1,
+            "word": table[start - 1]["word"],
+            "frequency": frequency,
+            "log_rank": log_rank,
+            "log_frequency": log_frequency,
+        }
+        for start, end, frequency, log_rank, log_frequency in zip(
+            rank_bins.starts.tolist(),
+            rank_bins.ends.tolist(),
+            rank_bins.mean_frequency.tolist(),
+            rank_bins.log_rank.tolist(),
+            rank_bins.log_frequency.tolist(),
+        )
+    ]
+
+
+def _heaps_payload(curve: np.ndarray, fit: HeapsFit, target_tokens: int) -> dict:
+    tokens = curve[:, 0]
+    vocabulary = curve[:, 1]
+    metadata = {
+        "k": fit.k,
+        "beta": fit.beta,
+        "r_squared": fit.r_squared,
+        "points_count": len(curve),
+        "target_vocabulary": target_tokens,
+        "estimated_tokens_for_target": fit.tokens_for_vocabulary(target_tokens),
+    }
+    points = [
+        {
+            "tokens": token_count,
+            "vocabulary": unique_count,
+            "log_tokens": log_tokens,
+            "log_vocabulary": log_vocabulary,
+        }
+        for token_count, unique_count, log_tokens, log_vocabulary in zip(
+            tokens.tolist(),
+            vocabulary.tolist(),
+            np.log(tokens.astype(np.float64)).tolist(),
+            np.log(vocabulary.astype(np.float64)).tolist(),
+        )
+    ]
+    return {"metadata": metadata, "points": points}
+
+
+def _analyse(args: argparse.Namespace, target_tokens: int) -> None:
+    frequency_payload = load_or_build_frequency(target_tokens=target_tokens)
     table = frequency_payload["data"]
-    limit = min(len(table), args.max_points)
-    points = []
-    chart_points = []
-    for entry in table[:limit]:
-        rank = entry["rank"]
-        freq = entry["count"]
-        log_rank = math.log(rank)
-        log_freq = math.log(freq)
-        points.append((log_rank, log_freq))
-        chart_points.append(
+    frequencies = np.array([entry["count"] for entry in table], dtype=np.int64)
+    if args.bins > 0:
+        limit = len(table)
+        log_ranks, log_freqs = log_rank_frequency(frequencies, limit)
+        chart_points = _binned_points(table, frequencies, args.bins)
+    else:
+        limit = min(len(table), args.max_points)
+        log_ranks, log_freqs = log_rank_frequency(frequencies, limit)
+        chart_points = [
             {
-                "rank": rank,
+                "rank": entry["rank"],
                 "word": entry["word"],
-                "frequency": freq,
+                "frequency": entry["count"],
                 "log_rank": log_rank,
                 "log_frequency": log_freq,
             }
-        )
+            for entry, log_rank, log_freq in zip(
+                table[:limit], log_ranks.tolist(), log_freqs.tolist()
+            )
+        ]
+    close_frequency(frequency_payload)
 
-    slope, intercept, r_squared = linear_regression(points)
-
-    payload = {
-        "metadata": {
-            "points_count": limit,
-            "slope": slope,
-            "intercept": intercept,
-            "r_squared": r_squared,
-            "expected_frequency_factor": math.exp(intercept),
-        },
-        "points": chart_points,
+    ols = ols_fit(log_ranks, log_freqs)
+    metadata = {
+        "points_count": limit,
+        "slope": ols.slope,
+        "intercept": ols.intercept,
+        "r_squared": ols.r_squared,
+        "expected_frequency_factor": math.exp(ols.intercept),
+        "ols": {"exponent": -ols.slope},
     }
+    if frequency_payload["metadata"].get("approximate"):
+        # Top-k table from the whole dump; counts are count-min upper bounds.
+        metadata["approximate_frequency"] = True
+    if args.bins > 0:
+        metadata["binned"] = True
+        metadata["bins_count"] = len(chart_points)
+
+    power_law = fit_power_law(frequencies, args.x_min)
+    if power_law is not None:
+        metadata["mle"] = {
+            "alpha": power_law.alpha,
+            "zipf_exponent": power_law.zipf_exponent,
+            "x_min": power_law.x_min,
+            "tail_size": power_law.tail_size,
+            "ks_distance": power_law.ks_distance,
+            "log_likelihood": power_law.log_likelihood,
+        }
 
-    output_path = zipf_path()
+    if args.bootstrap > 0 and power_law is not None:
+        slopes, alphas = bootstrap(
+            frequencies,
+            limit,
+            power_law.x_min,
+            args.bootstrap,
+            workers=args.workers,
+            seed=args.seed,
+        )
+        # Intervals that cannot be computed are left out of the JSON.
+        slope_ci = percentile_interval(slopes, args.confidence)
+        if slope_ci is not None:
+            slope_low, slope_high = slope_ci
+            metadata["ols"]["exponent_ci"] = [-slope_high, -slope_low]
+        alpha_ci = percentile_interval(alphas, args.confidence)
+        if alpha_ci is not None:
+            metadata["mle"]["alpha_ci"] = list(alpha_ci)
+            zipf_exponent_ci = _reciprocal_interval(alpha_ci)
+            if zipf_exponent_ci is not None:
+                metadata["mle"]["zipf_exponent_ci"] = list(zipf_exponent_ci)
+        metadata["bootstrap"] = {
+            "samples": args.bootstrap,
+            "confidence": args.confidence,
+            "seed": args.seed,
+        }
+
+    # Vocabulary growth recorded while the corpus was collected; tables counted
+    # without a corpus and corpora from the legacy JSON export do not have it.
+    heaps = None
+    corpus = load_corpus(target_tokens)
+    curve = corpus.heaps if corpus is not None else None
+    if curve is not None and len(curve) >= 2:
+        curve = np.asarray(curve)
+        heaps = fit_heaps(curve[:, 0], curve[:, 1])
+        metadata["heaps"] = {"k": heaps.k, "beta": heaps.beta, "r_squared": heaps.r_squared}
+        write_json(
+            heaps_path(target_tokens), _heaps_payload(curve, heaps, target_tokens)
+        )
+
+    payload = {"metadata": metadata, "points": chart_points}
+
+    output_path = zipf_path(target_tokens)
     write_json(output_path, payload)
     print(
-        f"Zipf: nachylenie={slope:.3f}, R^2={r_squared:.3f}, punkty={limit} -> {output_path}"
+        f"Zipf: nachylenie={ols.slope:.3f}, R^2={ols.r_squared:.3f}, "
+        f"punkty={limit} -> {output_path}"
+    )
+    if power_law is not None:
+        print(
+            f"MLE: alpha={power_law.alpha:.3f} (s={power_law.zipf_exponent:.3f}), "
+            f"x_min={power_law.x_min}, ogon={power_law.tail_size}, "
+            f"KS={power_law.ks_distance:.4f}"
+        )
+    if heaps is not None:
+        print(
+            f"Heaps: K={heaps.k:.3f}, beta={heaps.beta:.3f}, "
+            f"R^2={heaps.r_squared:.3f} -> {heaps_path(target_tokens)}"
+        )
+
+
+def _has_frequency(target_tokens: int) -> bool:
+    if target_tokens == TARGET_TOKEN_COUNT:
+        view = open_frequency_view()
+        if view is not None:
+            view.close()
+            return True
+    return existing_json(frequency_path(target_tokens)) is not None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analiza prawa Zipfa dla korpusu.")
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=2000,
+        help="Maksymalna liczba punktów (rang) wykorzystanych w regresji.",
     )
+    parser.add_argument(
+        "--bins",
+        type=int,
+        default=0,
+        help=(
+            "Dopasowanie do całej tabeli częstości i tyle logarytmicznych przedziałów "
+            "rang na wykresie (0 = jeden punkt na rangę, do --max-points)."
+        ),
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=200,
+        help="Liczba prób bootstrapowych dla przedziałów ufności (0 = bez przedziałów).",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument(
+        "--x-min",
+        type=int,
+        default=None,
+        help="Stały próg x_min dla estymatora MLE (domyślnie wybierany testem KS).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Liczba procesów liczących próby bootstrapowe.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[TARGET_TOKEN_COUNT],
+        help="Rozmiary korpusu, dla których powstają osobne analizy.",
+    )
+    args = parser.parse_args()
+
+    sizes = sorted(set(args.sizes))
+    # Only missing frequency tables need a corpus; those are collected in one
+    # scan of the dump.
+    missing = [size for size in sizes if not _has_frequency(size)]
+    if missing:
+        load_or_build_corpora(missing)
+    for size in sizes:
+        _analyse(args, size)
 
 
 if __name__ == "__main__":
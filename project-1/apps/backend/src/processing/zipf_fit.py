@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Euler-Maclaurin terms for the Hurwitz zeta function: B_2j / (2j)!
+_BERNOULLI_TERMS = (
+    1.0 / 12.0,
+    -1.0 / 720.0,
+    1.0 / 30240.0,
+    -1.0 / 1209600.0,
+    1.0 / 47900160.0,
+    -691.0 / 1307674368000.0,
+)
+_ZETA_DIRECT_TERMS = 10
+ALPHA_BOUNDS = (1.0001, 10.0)
+MIN_TAIL_SIZE = 50
+MAX_XMIN_CANDIDATES = 200
+
+
+@dataclass
+class OlsFit:
+    slope: float
+    intercept: float
+    r_squared: float
+
+
+@dataclass
+class PowerLawFit:
+    alpha: float
+    x_min: int
+    tail_size: int
+    ks_distance: float
+    log_likelihood: float
+
+    @property
+    def zipf_exponent(self) -> float:
+        # P(f) ~ f^-alpha over frequencies <=> f(r) ~ r^-s over ranks, s = 1 / (alpha - 1).
+        return 1.0 / (self.alpha - 1.0)
+
+
+def ols_fit(x: np.ndarray, y: np.ndarray) -> OlsFit:
+    n = len(x)
+    if n == 0:
+        return OlsFit(0.0, 0.0, 0.0)
+    x_mean = x.mean()
+    y_mean = y.mean()
+    dx = x - x_mean
+    sxx = float(dx @ dx)
+    slope = float(dx @ (y - y_mean)) / sxx if sxx else 0.0
+    intercept = float(y_mean - slope * x_mean)
+    residuals = y - (slope * x + intercept)
+    ss_res = float(residuals @ residuals)
+    dy = y - y_mean
+    ss_tot = float(dy @ dy)
+    r_squared = 1 - ss_res / ss_tot if ss_tot else 0.0
+    return OlsFit(slope, intercept, r_squared)
+
+
+def log_rank_frequency(frequencies: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Frequencies sorted in descending order -> (log rank, log frequency) of the top ranks.
+    top = frequencies[:max_points]
+    ranks = np.arange(1, len(top) + 1, dtype=np.float64)
+    return np.log(ranks), np.log(top.astype(np.float64))
+
+
+@dataclass
+class RankBins:
+    # Rank ranges [start, end] (1-based, inclusive) with per-bin averages.
+    starts: np.ndarray
+    ends: np.ndarray
+    log_rank: np.ndarray
+    log_frequency: np.ndarray
+    mean_frequency: np.ndarray
+
+
+def log_binned_ranks(frequencies: np.ndarray, bins: int) -> RankBins:
+    # Log-spaced rank bins over the whole table. Low ranks get one bin each, so
+    # the head of the curve is exact and only the tail is averaged.
+    count = len(frequencies)
+    edges = np.unique(np.geomspace(1, count + 1, bins + 1).astype(np.int64))
+    edges[-1] = count + 1
+    starts = edges[:-1]
+    sizes = np.diff(edges)
+    ranks = np.arange(1, count + 1, dtype=np.float64)
+    values = frequencies.astype(np.float64)
+    offsets = starts - 1
+    log_rank = np.add.reduceat(np.log(ranks), offsets) / sizes
+    log_frequency = np.add.reduceat(np.log(values), offsets) / sizes
+    mean_frequency = np.add.reduceat(values, offsets) / sizes
+    return RankBins(starts, edges[1:] - 1, log_rank, log_frequency, mean_frequency)
+
+
+@dataclass
+class HeapsFit:
+    # V(N) = k * N^beta: unique lemmas after N corpus tokens.
+    k: float
+    beta: float
+    r_squared: float
+
+    def tokens_for_vocabulary(self, vocabulary: int) -> float:
+        return (vocabulary / self.k) ** (1.0 / self.beta) if self.beta > 0 else math.inf
+
+
+def fit_heaps(tokens: np.ndarray, vocabulary: np.ndarray) -> HeapsFit:
+    fit = ols_fit(np.log(tokens.astype(np.float64)), np.log(vocabulary.astype(np.float64)))
+    return HeapsFit(math.exp(fit.intercept), fit.slope, fit.r_squared)
+
+
+def hurwitz_zeta(s: float, q: np.ndarray) -> np.ndarray:
+    # zeta(s, q) = sum_{k>=0} (q + k)^-s for s > 1, q > 0 (Euler-Maclaurin).
+    q = np.asarray(q, dtype=np.float64)
+    total = np.zeros_like(q)
+    for k in range(_ZETA_DIRECT_TERMS):
+        total += (q + k) ** -s
+    a = q + _ZETA_DIRECT_TERMS
+    total += a ** (1.0 - s) / (s - 1.0) + 0.5 * a**-s
+    rising = s
+    power = a ** (-s - 1.0)
+    for j, term in enumerate(_BERNOULLI_TERMS):
+        total += term * rising * power
+        rising *= (s + 2 * j + 1) * (s + 2 * j + 2)
+        power = power / (a * a)
+    return total
+
+
+def _negative_log_likelihood(alpha: float, x_min: int, n: int, log_sum: float) -> float:
+    return n * math.log(float(hurwitz_zeta(alpha, np.array([x_min]))[0])) + alpha * log_sum
+
+
+def _golden_section(function, low: float, high: float, tolerance: float = 1e-7) -> float:
+    ratio = (math.sqrt(5.0) - 1.0) / 2.0
+    a, b = low, high
+    c = b - ratio * (b - a)
+    d = a + ratio * (b - a)
+    fc, fd = function(c), function(d)
+    while b - a > tolerance:
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - ratio * (b - a)
+            fc = function(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + ratio * (b - a)
+            fd = function(d)
+    return (a + b) / 2.0
+
+
+def fit_alpha(tail: np.ndarray, x_min: int) -> Tuple[float, float]:
+    # Discrete power-law MLE of alpha for the values >= x_min.
+    n = len(tail)
+    log_sum = float(np.log(tail.astype(np.float64)).sum())
+    alpha = _golden_section(
+        lambda value: _negative_log_likelihood(value, x_min, n, log_sum), *ALPHA_BOUNDS
+    )
+    return alpha, -_negative_log_likelihood(alpha, x_min, n, log_sum)
+
+
+def ks_distance(tail: np.ndarray, alpha: float, x_min: int) -> float:
+    values, counts = np.unique(tail, return_counts=True)
+    empirical = np.cumsum(counts) / len(tail)
+    normalizer = hurwitz_zeta(alpha, np.array([x_min]))[0]
+    model = 1.0 - hurwitz_zeta(alpha, values + 1.0) / normalizer
+    return float(np.abs(empirical - model).max())
+
+
+def _xmin_candidates(frequencies: np.ndarray) -> np.ndarray:
+    values = np.unique(frequencies)
+    tail_sizes = len(frequencies) - np.searchsorted(np.sort(frequencies), values)
+    values = values[tail_sizes >= MIN_TAIL_SIZE]
+    if len(values) > MAX_XMIN_CANDIDATES:
+        # Log-spaced subset: most distinct values are large and very sparse.
+        picks = np.unique(
+            np.geomspace(1, len(values), MAX_XMIN_CANDIDATES).astype(np.int64) - 1
+        )
+        values = values[picks]
+    return values
+
+
+def fit_power_law(frequencies: np.ndarray, x_min: Optional[int] = None) -> Optional[PowerLawFit]:
+    # x_min minimizing the Kolmogorov-Smirnov distance unless given (Clauset et al. 2009).
+    frequencies = np.asarray(frequencies, dtype=np.int64)
+    candidates = np.array([x_min]) if x_min is not None else _xmin_candidates(frequencies)
+    best: Optional[PowerLawFit] = None
+    for candidate in candidates.tolist():
+        tail = frequencies[frequencies >= candidate]
+        if len(tail) < 2 or tail.min() == tail.max():
+            continue
+        alpha, log_likelihood = fit_alpha(tail, candidate)
+        distance = ks_distance(tail, alpha, candidate)
+        if best is None or distance < best.ks_distance:
+            best = PowerLawFit(alpha, candidate, len(tail), distance, log_likelihood)
+    return best
+
+
+def _bootstrap_batch(
+    frequencies: np.ndarray,
+    max_points: int,
+    x_min: int,
+    seed: np.random.SeedSequence,
+    samples: int,
+) -> Tuple[List[float], List[float]]:
+    # Resamples words with replacement and refits both estimators; x_min stays fixed.
+    generator = np.random.default_rng(seed)
+    slopes: List[float] = []
+    alphas: List[float] = []
+    for _ in range(samples):
+        sample = generator.choice(frequencies, size=len(frequencies), replace=True)
+        sample = np.sort(sample)[::-1]
+        slopes.append(ols_fit(*log_rank_frequency(sample, max_points)).slope)
+        tail = sample[sample >= x_min]
+        if len(tail) >= 2:
+            alphas.append(fit_alpha(tail, x_min)[0])
+    return slopes, alphas
+
+
+def bootstrap(
+    frequencies: np.ndarray,
+    max_points: int,
+    x_min: int,
+    samples: int,
+    workers: int = 1,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Samples are split into per-task batches with their own child seeds, so
+    # the result does not depend on the number of workers.
+    batch_size = 10
+    sizes = [min(batch_size, samples - start) for start in range(0, samples, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    frequencies = np.asarray(frequencies, dtype=np.int64)
+    tasks = [(frequencies, max_points, x_min, child, size) for child, size in zip(seeds, sizes)]
+    if workers <= 1:
+        results = [_bootstrap_batch(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_bootstrap_batch, *zip(*tasks)))
+    slopes = [value for batch, _ in results for value in batch]
+    alphas = [value for _, batch in results for value in batch]
+    return np.array(slopes), np.array(alphas)
+
+
+def percentile_interval(
+    values: np.ndarray, confidence: float
+) -> Optional[Tuple[float, float]]:
+    # None when there is no finite sample to take percentiles of.
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return None
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    low, high = np.percentile(values, [tail, 100.0 - tail])
+    return float(low), float(high)
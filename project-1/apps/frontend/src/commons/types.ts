@@ -14,8 +14,13 @@ export type FrequencyEntry = {
 
 export type FrequencyMetadata = {
 	total_tokens: number;
-	unique_words: number;
-	source_corpus_tokens: number;
+	unique_words?: number;
+	source_corpus_tokens?: number;
+	approximate?: boolean;
+	unique_words_estimate?: number | null;
+	candidates?: number;
+	rows?: number;
+	mode?: "map_reduce";
 };
 
 export type FrequencyResponse = {
@@ -23,6 +28,23 @@ export type FrequencyResponse = {
 	data: FrequencyEntry[];
 };
 
+export type FrequencyShard = {
+	file: string;
+	first_rank: number;
+	last_rank: number;
+	rows: number;
+	bytes: number;
+	sha256: string;
+};
+
+export type FrequencyManifest = {
+	version: number;
+	metadata: FrequencyMetadata;
+	rows_per_shard: number;
+	total_rows: number;
+	shards: FrequencyShard[];
+};
+
 export type FrequencySortKey =
 	| "rank"
 	| "word"
@@ -35,6 +57,36 @@ export type ZipfPoint = {
 	frequency: number;
 	log_rank: number;
 	log_frequency: number;
+	rank_end?: number;
+	bin_size?: number;
+};
+
+export type ZipfOlsFit = {
+	exponent: number;
+	exponent_ci?: [number, number];
+};
+
+export type ZipfMleFit = {
+	alpha: number;
+	zipf_exponent: number;
+	x_min: number;
+	tail_size: number;
+	ks_distance: number;
+	log_likelihood: number;
+	alpha_ci?: [number, number];
+	zipf_exponent_ci?: [number, number];
+};
+
+export type ZipfBootstrap = {
+	samples: number;
+	confidence: number;
+	seed: number;
+};
+
+export type HeapsFit = {
+	k: number;
+	beta: number;
+	r_squared: number;
 };
 
 export type ZipfMetadata = {
@@ -43,6 +95,12 @@ export type ZipfMetadata = {
 	intercept: number;
 	r_squared: number;
 	expected_frequency_factor: number;
+	binned?: boolean;
+	bins_count?: number;
+	ols?: ZipfOlsFit;
+	mle?: ZipfMleFit;
+	bootstrap?: ZipfBootstrap;
+	heaps?: HeapsFit;
 };
 
 export type ZipfResponse = {
@@ -55,12 +113,19 @@ export type CoreNode = {
 	frequency: number;
 	unique_neighbors: number;
 	connection_weight: number;
+	association_strength?: number;
 };
 
+export type CoreEdgeScore = "count" | "pmi" | "npmi" | "llr" | "t_score";
+
 export type CoreEdge = {
 	source: string;
 	target: string;
 	weight: number;
+	pmi?: number;
+	npmi?: number;
+	llr?: number;
+	t_score?: number;
 };
 
 export type CoreMetadata = {
@@ -73,6 +138,11 @@ export type CoreMetadata = {
 	min_frequency?: number;
 	min_connection_weight?: number;
 	max_nodes?: number;
+	window?: number;
+	distance_weighted?: boolean;
+	neighbor_pairs?: number;
+	score?: CoreEdgeScore;
+	min_score?: number;
 	selected_nodes?: number;
 	selected_edges?: number;
 };
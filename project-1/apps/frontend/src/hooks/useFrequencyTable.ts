@@ -1,35 +1,120 @@
 import { useEffect, useState } from "react";
 import type {
 	FrequencyEntry,
+	FrequencyManifest,
 	FrequencyMetadata,
-	FrequencyResponse,
+	FrequencyShard,
 } from "../commons/types";
 
-const frequencyTableUrl = new URL(
-	"../data/frequency_table.json",
+const manifestUrl = new URL(
+	"../data/frequency/manifest.json",
 	import.meta.url
 ).toString();
 
+function shardUrl(file: string): string {
+	return new URL(`../data/frequency/${file}`, import.meta.url).toString();
+}
+
+export type FrequencyQuery =
+	| { kind: "all" }
+	| { kind: "page"; offset: number; limit: number; descending: boolean };
+
 type UseFrequencyTableResult = {
 	data: FrequencyEntry[] | null;
 	metadata: FrequencyMetadata | null;
+	totalRows: number;
+	topEntry: FrequencyEntry | null;
 	isLoading: boolean;
+	isPageLoading: boolean;
 	error: string | null;
 };
 
-export default function useFrequencyTable(): UseFrequencyTableResult {
-	const [data, setData] = useState<FrequencyEntry[] | null>(null);
-	const [metadata, setMetadata] = useState<FrequencyMetadata | null>(null);
+type LoadedRows = {
+	key: string;
+	kind: FrequencyQuery["kind"];
+	rows: FrequencyEntry[];
+};
+
+// Shards are keyed by content hash, so each one is downloaded at most once.
+const shardCache = new Map<string, Promise<FrequencyEntry[]>>();
+
+async function sha256Hex(buffer: ArrayBuffer): Promise<string> {
+	const digest = await crypto.subtle.digest("SHA-256", buffer);
+	return Array.from(new Uint8Array(digest), (byte) =>
+		byte.toString(16).padStart(2, "0")
+	).join("");
+}
+
+async function fetchShard(shard: FrequencyShard): Promise<FrequencyEntry[]> {
+	const response = await fetch(shardUrl(shard.file));
+	if (!response.ok) {
+		throw new Error(
+			`Nie udało się pobrać fragmentu ${shard.file} (${response.status})`
+		);
+	}
+	const buffer = await response.arrayBuffer();
+	// crypto.subtle is only available in secure contexts.
+	if (crypto.subtle && (await sha256Hex(buffer)) !== shard.sha256) {
+		throw new Error(`Niezgodna suma kontrolna fragmentu ${shard.file}`);
+	}
+	return JSON.parse(new TextDecoder().decode(buffer)) as FrequencyEntry[];
+}
+
+function loadShard(shard: FrequencyShard): Promise<FrequencyEntry[]> {
+	let pending = shardCache.get(shard.sha256);
+	if (!pending) {
+		pending = fetchShard(shard);
+		shardCache.set(shard.sha256, pending);
+		pending.catch(() => shardCache.delete(shard.sha256));
+	}
+	return pending;
+}
+
+// Rows [start, end) in rank order, fetching only the shards that cover them.
+async function loadRows(
+	manifest: FrequencyManifest,
+	start: number,
+	end: number
+): Promise<FrequencyEntry[]> {
+	const shards = manifest.shards.filter(
+		(shard) => shard.first_rank - 1 < end && shard.last_rank > start
+	);
+	if (!shards.length) {
+		return [];
+	}
+	const parts = await Promise.all(shards.map(loadShard));
+	const offset = shards[0].first_rank - 1;
+	return parts.flat().slice(start - offset, end - offset);
+}
+
+function queryRange(query: FrequencyQuery, totalRows: number): [number, number] {
+	if (query.kind === "all") {
+		return [0, totalRows];
+	}
+	if (query.descending) {
+		const end = Math.max(totalRows - query.offset, 0);
+		return [Math.max(end - query.limit, 0), end];
+	}
+	return [query.offset, Math.min(query.offset + query.limit, totalRows)];
+}
+
+export default function useFrequencyTable(
+	query: FrequencyQuery
+): UseFrequencyTableResult {
+	const [manifest, setManifest] = useState<FrequencyManifest | null>(null);
+	const [topEntry, setTopEntry] = useState<FrequencyEntry | null>(null);
+	const [loaded, setLoaded] = useState<LoadedRows | null>(null);
 	const [isLoading, setIsLoading] = useState(true);
+	const [isPageLoading, setIsPageLoading] = useState(false);
 	const [error, setError] = useState<string | null>(null);
 
 	useEffect(() => {
 		const controller = new AbortController();
 
-		async function loadFrequencyTable() {
+		async function loadManifest() {
 			try {
 				setIsLoading(true);
-				const response = await fetch(frequencyTableUrl, {
+				const response = await fetch(manifestUrl, {
 					signal: controller.signal,
 				});
 
@@ -39,9 +124,13 @@ export default function useFrequencyTable(): UseFrequencyTableResult {
 					);
 				}
 
-				const payload = (await response.json()) as FrequencyResponse;
-				setData(payload.data);
-				setMetadata(payload.metadata);
+				const payload = (await response.json()) as FrequencyManifest;
+				const [first] = await loadRows(payload, 0, 1);
+				if (controller.signal.aborted) {
+					return;
+				}
+				setManifest(payload);
+				setTopEntry(first ?? null);
 				setError(null);
 			} catch (err) {
 				if ((err as Error).name === "AbortError") {
@@ -56,10 +145,66 @@ export default function useFrequencyTable(): UseFrequencyTableResult {
 			}
 		}
 
-		void loadFrequencyTable();
+		void loadManifest();
 
 		return () => controller.abort();
 	}, []);
 
-	return { data, metadata, isLoading, error };
+	const key = JSON.stringify(query);
+
+	useEffect(() => {
+		if (!manifest) {
+			return;
+		}
+		let cancelled = false;
+		const current = JSON.parse(key) as FrequencyQuery;
+		const [start, end] = queryRange(current, manifest.total_rows);
+
+		setIsPageLoading(true);
+		loadRows(manifest, start, end)
+			.then((rows) => {
+				if (cancelled) {
+					return;
+				}
+				const ordered =
+					current.kind === "page" && current.descending
+						? [...rows].reverse()
+						: rows;
+				setLoaded({ key, kind: current.kind, rows: ordered });
+				setError(null);
+			})
+			.catch((err: Error) => {
+				if (!cancelled) {
+					setError(
+						err.message ?? "Wystąpił błąd podczas ładowania danych"
+					);
+				}
+			})
+			.finally(() => {
+				if (!cancelled) {
+					setIsPageLoading(false);
+				}
+			});
+
+		return () => {
+			cancelled = true;
+		};
+	}, [manifest, key]);
+
+	// While the next page loads the previous one stays visible, but rows
+	// loaded for a different kind of query are never handed out.
+	const data =
+		loaded && (loaded.key === key || loaded.kind === query.kind)
+			? loaded.rows
+			: null;
+
+	return {
+		data,
+		metadata: manifest?.metadata ?? null,
+		totalRows: manifest?.total_rows ?? 0,
+		topEntry,
+		isLoading,
+		isPageLoading,
+		error,
+	};
 }
@@ -5,6 +5,7 @@ type FrequencyPaginationProps = {
 	rangeEnd: number;
 	totalItems: number;
 	onPageChange: (page: number) => void;
+	isLoading?: boolean;
 };
 
 const numberFormatter = new Intl.NumberFormat("pl-PL");
@@ -16,6 +17,7 @@ export default function FrequencyPagination({
 	rangeEnd,
 	totalItems,
 	onPageChange,
+	isLoading = false,
 }: FrequencyPaginationProps) {
 	const hasNoData = totalItems === 0;
 
@@ -34,13 +36,16 @@ export default function FrequencyPagination({
 				<span className="font-semibold text-base-content">
 					{numberFormatter.format(totalItems)}
 				</span>
+				{isLoading ? (
+					<span className="loading loading-spinner loading-xs ml-2 align-middle text-primary" />
+				) : null}
 			</p>
 			<div className="join self-start md:self-auto">
 				<button
 					type="button"
 					className="btn btn-sm join-item"
 					onClick={() => onPageChange(page - 1)}
-					disabled={page <= 1 || hasNoData}
+					disabled={page <= 1 || hasNoData || isLoading}
 				>
 					Poprzednia
 				</button>
@@ -52,7 +57,7 @@ export default function FrequencyPagination({
 					type="button"
 					className="btn btn-sm join-item"
 					onClick={() => onPageChange(page + 1)}
-					disabled={page >= totalPages || hasNoData}
+					disabled={page >= totalPages || hasNoData || isLoading}
 				>
 					Następna
 				</button>
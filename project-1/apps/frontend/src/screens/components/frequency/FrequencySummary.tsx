@@ -20,6 +20,13 @@ export default function FrequencySummary({
 	filteredEntries,
 	topEntry,
 }: FrequencySummaryProps) {
+	const uniqueWords =
+		metadata.unique_words !== undefined
+			? numberFormatter.format(metadata.unique_words)
+			: metadata.unique_words_estimate != null
+				? `≈ ${numberFormatter.format(metadata.unique_words_estimate)}`
+				: "—";
+
 	return (
 		<section className="card border border-base-300 bg-base-100">
 			<div className="card-body space-y-4">
@@ -32,9 +39,15 @@ export default function FrequencySummary({
 							{numberFormatter.format(metadata.total_tokens)}
 						</div>
 						<div className="stat-desc">
-							Korpus źródłowy:{" "}
-							{numberFormatter.format(metadata.source_corpus_tokens)}{" "}
-							tokenów
+							{metadata.source_corpus_tokens !== undefined ? (
+								<>
+									Korpus źródłowy:{" "}
+									{numberFormatter.format(metadata.source_corpus_tokens)}{" "}
+									tokenów
+								</>
+							) : (
+								"Cały dump"
+							)}
 						</div>
 					</div>
 					<div className="stat">
@@ -42,7 +55,7 @@ export default function FrequencySummary({
 							Unikalne słowa
 						</div>
 						<div className="stat-value text-2xl text-secondary">
-							{numberFormatter.format(metadata.unique_words)}
+							{uniqueWords}
 						</div>
 						<div className="stat-desc">
 							Łącznie rekordów w tabeli:{" "}
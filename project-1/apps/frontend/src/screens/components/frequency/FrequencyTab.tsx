@@ -3,7 +3,9 @@ import type {
 	FrequencyEntry,
 	FrequencySortKey,
 } from "../../../commons/types";
-import useFrequencyTable from "../../../hooks/useFrequencyTable";
+import useFrequencyTable, {
+	type FrequencyQuery,
+} from "../../../hooks/useFrequencyTable";
 import FrequencyPagination from "./FrequencyPagination";
 import FrequencySummary from "./FrequencySummary";
 import FrequencyTable from "./FrequencyTable";
@@ -60,7 +62,6 @@ function sortEntries(
 }
 
 export default function FrequencyTab() {
-	const { data, metadata, isLoading, error } = useFrequencyTable();
 	const [searchTerm, setSearchTerm] = useState("");
 	const [pageSize, setPageSize] = useState(PAGE_SIZE_OPTIONS[1]);
 	const [page, setPage] = useState(1);
@@ -71,8 +72,33 @@ export default function FrequencyTab() {
 		[searchTerm]
 	);
 
+	// Browsing by rank only needs the shards behind the current page; searching
+	// and other sort orders work on the whole table.
+	const isPaged = !normalizedSearch && sort.key === "rank";
+	const query = useMemo<FrequencyQuery>(
+		() =>
+			isPaged
+				? {
+						kind: "page",
+						offset: (page - 1) * pageSize,
+						limit: pageSize,
+						descending: sort.direction === "desc",
+				  }
+				: { kind: "all" },
+		[isPaged, page, pageSize, sort.direction]
+	);
+	const {
+		data,
+		metadata,
+		totalRows,
+		topEntry,
+		isLoading,
+		isPageLoading,
+		error,
+	} = useFrequencyTable(query);
+
 	const filteredEntries = useMemo(() => {
-		if (!data) {
+		if (!data || isPaged) {
 			return [];
 		}
 
@@ -83,20 +109,24 @@ export default function FrequencyTab() {
 		return data.filter((entry) =>
 			entry.word.toLowerCase().includes(normalizedSearch)
 		);
-	}, [data, normalizedSearch]);
+	}, [data, isPaged, normalizedSearch]);
 
 	const sortedEntries = useMemo(
 		() => sortEntries(filteredEntries, sort),
 		[filteredEntries, sort]
 	);
 
-	const totalPages = Math.max(1, Math.ceil(sortedEntries.length / pageSize));
+	const filteredCount = isPaged ? totalRows : filteredEntries.length;
+	const totalPages = Math.max(1, Math.ceil(filteredCount / pageSize));
 	const currentPage = Math.min(page, totalPages);
 
 	const paginatedEntries = useMemo(() => {
+		if (isPaged) {
+			return data ?? [];
+		}
 		const startIndex = (currentPage - 1) * pageSize;
 		return sortedEntries.slice(startIndex, startIndex + pageSize);
-	}, [sortedEntries, currentPage, pageSize]);
+	}, [isPaged, data, sortedEntries, currentPage, pageSize]);
 
 	const hasEntries = paginatedEntries.length > 0;
 	const rangeStart = hasEntries ? (currentPage - 1) * pageSize + 1 : 0;
@@ -167,18 +197,16 @@ export default function FrequencyTab() {
 		);
 	}
 
-	if (!data || !metadata) {
+	if (!metadata) {
 		return null;
 	}
 
-	const topEntry = data[0] ?? null;
-
 	return (
 		<section className="space-y-6">
 			<FrequencySummary
 				metadata={metadata}
-				totalEntries={data.length}
-				filteredEntries={filteredEntries.length}
+				totalEntries={totalRows}
+				filteredEntries={filteredCount}
 				topEntry={topEntry}
 			/>
 			<FrequencyToolbar
@@ -187,11 +215,11 @@ export default function FrequencyTab() {
 				pageSize={pageSize}
 				onPageSizeChange={handlePageSizeChange}
 				pageSizeOptions={PAGE_SIZE_OPTIONS}
-				filteredCount={filteredEntries.length}
+				filteredCount={filteredCount}
 				onReset={handleResetFilters}
 				isFiltered={
 					Boolean(normalizedSearch) ||
-					filteredEntries.length !== data.length ||
+					filteredCount !== totalRows ||
 					sort.key !== "rank" ||
 					sort.direction !== "asc" ||
 					pageSize !== PAGE_SIZE_OPTIONS[1]
@@ -210,8 +238,9 @@ export default function FrequencyTab() {
 						totalPages={totalPages}
 						rangeStart={rangeStart}
 						rangeEnd={rangeEnd}
-						totalItems={sortedEntries.length}
+						totalItems={filteredCount}
 						onPageChange={handlePageChange}
+						isLoading={isPageLoading}
 					/>
 				</div>
 			</div>
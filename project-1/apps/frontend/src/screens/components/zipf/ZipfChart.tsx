@@ -140,7 +140,10 @@ export default function ZipfChart({ points, metadata }: ZipfChartProps) {
 						fill="var(--color-secondary)"
 					>
 						<title>
-							{point.rank}. {point.word} — {point.frequency.toLocaleString("pl-PL")}
+							{point.rank_end && point.rank_end > point.rank
+								? `${point.rank}–${point.rank_end} (od „${point.word}”)`
+								: `${point.rank}. ${point.word}`}{" "}
+							— {point.frequency.toLocaleString("pl-PL")}
 						</title>
 					</circle>
 				))}
@@ -6,7 +6,18 @@ type ZipfMetricCardsProps = {
 
 const numberFormatter = new Intl.NumberFormat("pl-PL");
 
+function formatInterval(interval?: [number, number]): string | null {
+	if (!interval) {
+		return null;
+	}
+	return `[${interval[0].toFixed(3)}; ${interval[1].toFixed(3)}]`;
+}
+
 export default function ZipfMetricCards({ metadata }: ZipfMetricCardsProps) {
+	const { mle, bootstrap, heaps } = metadata;
+	const confidence = bootstrap ? Math.round(bootstrap.confidence * 100) : null;
+	const mleInterval = formatInterval(mle?.zipf_exponent_ci);
+
 	return (
 		<div className="stats stats-vertical lg:stats-horizontal w-full">
 			<div className="stat rounded-box border border-base-300 bg-base-100 px-4 py-3">
@@ -14,10 +25,14 @@ export default function ZipfMetricCards({ metadata }: ZipfMetricCardsProps) {
 					Punkty wykresu
 				</div>
 				<div className="stat-value text-2xl font-semibold">
-					{numberFormatter.format(metadata.points_count)}
+					{numberFormatter.format(metadata.bins_count ?? metadata.points_count)}
 				</div>
 				<div className="stat-desc text-sm text-base-content/70">
-					Każdy punkt odpowiada rangi i częstości wyrazu.
+					{metadata.binned
+						? `Przedziały logarytmiczne rang; regresja na ${numberFormatter.format(
+								metadata.points_count
+							)} rangach.`
+						: "Każdy punkt odpowiada rangi i częstości wyrazu."}
 				</div>
 			</div>
 			<div className="stat rounded-box border border-base-300 bg-base-100 px-4 py-3">
@@ -42,6 +57,35 @@ export default function ZipfMetricCards({ metadata }: ZipfMetricCardsProps) {
 					Logarytm oczekiwanej częstości dla rzędu 1.
 				</div>
 			</div>
+			{mle ? (
+				<div className="stat rounded-box border border-base-300 bg-base-100 px-4 py-3">
+					<div className="stat-title text-xs uppercase tracking-wide text-base-content/60">
+						Wykładnik (MLE)
+					</div>
+					<div className="stat-value text-2xl font-semibold">
+						{mle.zipf_exponent.toFixed(3)}
+					</div>
+					<div className="stat-desc text-sm text-base-content/70">
+						{mleInterval && confidence
+							? `${confidence}% CI ${mleInterval}, `
+							: ""}
+						x_min = {numberFormatter.format(mle.x_min)}
+					</div>
+				</div>
+			) : null}
+			{heaps ? (
+				<div className="stat rounded-box border border-base-300 bg-base-100 px-4 py-3">
+					<div className="stat-title text-xs uppercase tracking-wide text-base-content/60">
+						Prawo Heapsa
+					</div>
+					<div className="stat-value text-2xl font-semibold">
+						β = {heaps.beta.toFixed(3)}
+					</div>
+					<div className="stat-desc text-sm text-base-content/70">
+						K = {heaps.k.toFixed(3)}, R² = {heaps.r_squared.toFixed(3)}
+					</div>
+				</div>
+			) : null}
 		</div>
 	);
 }